@@ -1,7 +1,8 @@
 # BIBLIOTECAS
 # --------------------------------------
 import streamlit as st
-from PIL import Image
+
+from zomato.layout import sidebar
 # --------------------------------------
 
 
@@ -12,42 +13,8 @@ st.set_page_config(page_title="Zomato", page_icon='🟥', layout='wide')
 # BARRA LATERAL
 # ============================================
 
-# Imagem da barra lateral
-image_path = r'img/'
-image_sidebar = Image.open(image_path + "zomato_logo.png")
-st.sidebar.image(image_sidebar, width=160)
-
-
-st.markdown(
-    """
-    <style>
-        [data-testid=stSidebar] [data-testid=stImage]{
-            text-align: center;
-            display: block;
-            margin-left: auto;
-            margin-right: auto;
-            width: 100%;
-        }
-    </style>
-    """, unsafe_allow_html=True)
-
-
-st.sidebar.markdown("""---""")
-
-
-
-# Primeira seção da barra lateral
-st.sidebar.markdown('# Welcome! ')
-st.sidebar.markdown("Let's take a tour around the company.")
-st.sidebar.markdown("""---""")
-
-
-# Segunda seção da barra lateral
-# My LinkedIn URL
-linkedin_url = "https://www.linkedin.com/in/victor-bongestab/"
-name = "Victor Bongestab"
-
-st.sidebar.markdown(f"[![LinkedIn](https://img.icons8.com/color/48/000000/linkedin.png)]({linkedin_url}) {name}")
+# Logo, welcome and LinkedIn, shared by every page (images are loaded once per process)
+sidebar()
 
 
 
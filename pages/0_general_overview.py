@@ -1,169 +1,22 @@
 # IMPORTS
-import pandas as pd
-import inflection
-
 import streamlit as st
-from PIL import Image
-
-from streamlit_folium import folium_static
-import folium
-from folium.plugins import MarkerCluster
-
-
-# Dataset
-df_raw = pd.read_csv('zomato.csv')
-df = df_raw.copy()
-
-
-
-# CODE FUNCTIONS
-# ==============================================================================================================================================
-
-# DATA CLEANING
-# ==============================================================================================================================================
-
-def clean_code(df):
-    # Dropping duplicates.
-    df.drop_duplicates(inplace=True)
-
-
-    # Deleting rows with NaN values
-    for col in df:
-        df = df.loc[ (df[col].isnull() == False) , :]
-
-
-    # Making new columns to better describe the informations we have.
-    #
-
-    # Rename the columns to something_like_this.
-    def rename_columns(dataframe):
-        df = dataframe.copy()
-
-        title = lambda x: inflection.titleize(x)
-        snakecase = lambda x: inflection.underscore(x)
-        spaces = lambda x: x.replace(" ", "")
-
-        cols_old = list(df.columns)
-        cols_old = list(map(title, cols_old))
-        cols_old = list(map(spaces, cols_old))
-        cols_new = list(map(snakecase, cols_old))
-
-        df.columns = cols_new
-        return df
-
-    df = rename_columns(df).copy()
-
-
-
-    # Defining countries codes by their names.
-    countries = {
-                1: "India",
-                14: "Australia",
-                30: "Brazil",
-                37: "Canada",
-                94: "Indonesia",
-                148: "New Zeland",
-                162: "Philippines",
-                166: "Qatar",
-                184: "Singapure",
-                189: "South Africa",
-                191: "Sri Lanka",
-                208: "Turkey",
-                214: "United Arab Emirates",
-                215: "England",
-                216: "United States of America",
-                }
-
-    def country_name(country_id):
-        return countries[country_id]
-
-    df["country"] = df["country_code"].apply(country_name)
-
-
-
-    # Defining price ranges with a more intuitive description.
-    def create_price_type(price_range):
-        if price_range == 1:
-            return "cheap"
-        elif price_range == 2:
-            return "normal"
-        elif price_range == 3:
-            return "expensive"
-        else:
-            return "gourmet"
-
-    df["price_type"] = df["price_range"].apply(create_price_type)
-
-
-
-    # Transforming the hex code to color name.
-    colors = {
-            "3F7E00": "darkgreen",
-            "5BA829": "green",
-            "9ACD32": "lightgreen",
-            "CDD614": "lemon",
-            "FFBA00": "yellow",
-            "CBCBC8": "gray",
-            "FF7800": "orange",
-            }
-
-    def color_name(hex_code):
-        return colors[hex_code]
-
-    df["rating_color"] = df["rating_color"].apply(color_name)
-
-
 
-    # Translating the rating text.
-    rating_text = {
-                    "darkgreen": "Excellent",
-                    "green": "Very Good",
-                    "lightgreen": "Good",
-                    "lemon": "Average",
-                    "yellow": "Average",
-                    "gray": "Not rated",
-                    "orange": "Poor",
-                    }
+from zomato.artifacts import ARTIFACTS_DIR, artifact
+from zomato.cube import STREAMED
+from zomato.filters import filtered_cube, filtered_derived, filtered_frame, sidebar_filters
+from zomato.helpers import adjust_df
+from zomato.layout import image_bytes, sidebar
+from zomato.maps import MAP_MODES, cluster_levels, cluster_map, default_map_mode, marker_map, nearby_map, stream_cluster_levels
+from zomato.spatial import SpatialIndex
+from zomato.grid import GRID_METRICS, density_layer, quadtree_grid, stream_quadtree_grid
+from zomato.profiling import finish_run, stage, start_run
 
-    def rating_translation(rating_color):
-        return rating_text[rating_color]
-
-    df["rating_text"] = df["rating_color"].apply(rating_translation)
-
-
-
-    # Also use only one type of cuisine for the restaurants.
-    df["cuisines"] = df.loc[:, "cuisines"].apply(lambda x: x.split(",")[0])
-
-
-
-    # Convert every currency to Dollar and delete absurd values (over $ 10.000 a meal)
-    currency_convertion_to_dollar = {
-                                    'Botswana Pula(P)': 0.076,
-                                    'Brazilian Real(R$)': 0.21,
-                                    'Dollar($)': 1.0,
-                                    'Emirati Diram(AED)': 0.27,
-                                    'Indian Rupees(Rs.)': 0.012,
-                                    'Indonesian Rupiah(IDR)': 0.000067,
-                                    'NewZealand($)': 0.64,
-                                    'Pounds(£)': 1.31,
-                                    'Qatari Rial(QR)': 0.27,
-                                    'Rand(R)': 0.055,
-                                    'Sri Lankan Rupee(LKR)': 0.0031,
-                                    'Turkish Lira(TL)': 0.038
-                                    }
-
-    def price_in_dollar(original_currency, original_price):
-        return currency_convertion_to_dollar[original_currency] * original_price
-
-    df["dollar_average_cost_for_two"] = df.apply(lambda x: price_in_dollar(x["currency"], x["average_cost_for_two"]), axis=1)
-    df = df.loc[ (df["dollar_average_cost_for_two"] < 1000) ,:]
+from streamlit_folium import folium_static
 
 
-    # Reset index after cleaning everything.
-    return df.reset_index(drop=True)
+# Stage timings of this run (see zomato.profiling)
+start_run('general_overview')
 
-df = clean_code(df)
 
 # ==============================================================================================================================================
 # STREAMLIT
@@ -178,42 +31,22 @@ st.set_page_config(page_title= 'Zomato',page_icon= '🟥',layout= 'wide' )
 # BARRA LATERAL
 # ============================================
 
-# Imagem da barra lateral
-image_path = 'img/'
-image_sidebar = Image.open(image_path + "zomato_logo.png")
-st.sidebar.image(image_sidebar, width=160)
+# Logo, welcome and LinkedIn, shared by every page (images are loaded once per process)
+sidebar()
 
 
-st.markdown(
-    """
-    <style>
-        [data-testid=stSidebar] [data-testid=stImage]{
-            text-align: center;
-            display: block;
-            margin-left: auto;
-            margin-right: auto;
-            width: 100%;
-        }
-    </style>
-    """, unsafe_allow_html=True)
 
+# Terceira seção da barra lateral
+# Filters, shared by every page
+filters = sidebar_filters()
 
-st.sidebar.markdown("""---""")
 
-
-
-# Primeira seção da barra lateral
-st.sidebar.markdown('# Welcome! ')
-st.sidebar.markdown("Let's take a tour around the company.")
-st.sidebar.markdown("""---""")
-
-
-# Segunda seção da barra lateral
-# My LinkedIn URL
-linkedin_url = "https://www.linkedin.com/in/victor-bongestab/"
-name = "Victor Bongestab"
-
-st.sidebar.markdown(f"[![LinkedIn](https://img.icons8.com/color/48/000000/linkedin.png)]({linkedin_url}) {name}")
+# Dataset, restricted to the sidebar filters (only the restaurants' map columns and the totals when served
+# from precomputed artifacts). When the CSV is streamed in batches (ZOMATO_CHUNKSIZE) the rows are never
+# loaded: the map's clusters and grid are streamed too, and the markers and the nearby search are off.
+streamed = STREAMED and not ARTIFACTS_DIR
+df = None if streamed else artifact("markers", lambda: filtered_frame(filters))
+totals = artifact("totals", lambda: filtered_cube(filters)["totals"])
 
 
 
@@ -222,8 +55,7 @@ st.sidebar.markdown(f"[![LinkedIn](https://img.icons8.com/color/48/000000/linked
 # ============================================
 
 # TÍTULO principal
-top_image = Image.open(image_path + "zomato.png")
-st.image(top_image)
+st.image( image_bytes("zomato.png") )
 
 
 
@@ -235,32 +67,32 @@ with st.container():
     col1, col2, col3, col4, col5, col6 = st.columns(6)
     
     with col1:
-        num_of_unique_countries = len( df["country"].unique() )
+        num_of_unique_countries = totals["countries"]
         st.metric(label='Countries', value=num_of_unique_countries)
 
         
     with col2:
-        num_of_unique_cities = len( df["city"].unique() )
+        num_of_unique_cities = totals["cities"]
         st.metric(label='Cities', value=num_of_unique_cities)
 
 
     with col3:
-        num_of_unique_restaurants = len( df["restaurant_id"].unique() )
+        num_of_unique_restaurants = totals["restaurants"]
         st.metric(label='Restaurants', value=num_of_unique_restaurants)
         
     
     with col4:
-        num_of_unique_cuisines = len( df["cuisines"].unique() )
+        num_of_unique_cuisines = totals["cuisines"]
         st.metric(label='Cuisines', value=num_of_unique_cuisines)
         
     
     with col5:
-        num_of_unique_ratings = df["votes"].sum()
+        num_of_unique_ratings = totals["votes"]
         st.metric(label='Total Votings', value="{:,}".format(num_of_unique_ratings))
         
     
     with col6:
-        average_rating = df["aggregate_rating"].mean().round(2)
+        average_rating = round(totals["rating_mean"], 2)
         st.metric(label='Avg Rating', value=average_rating)
         
         
@@ -269,17 +101,83 @@ with st.container():
     # Container 02
     st.markdown("## World Map")
     
+    col1, col2 = st.columns(2)
+
+    with col1:
+        map_modes = MAP_MODES[:1] if streamed else MAP_MODES
+        map_mode = st.radio( 'Map mode', map_modes, index=0 if streamed else MAP_MODES.index( default_map_mode(len(df)) ), horizontal=True )
+
+    with col2:
+        density_metric = st.radio( 'Density layer', ['None'] + list(GRID_METRICS), horizontal=True )
+
     # Plot map
-    center_latitude = df['latitude'].mean()
-    center_longitude = df['longitude'].mean()
+    if map_mode == "Clusters":
+        # Clustered on the server, once per version of the dataset and filters
+        mapa = cluster_map( df, artifact("cluster_levels", lambda: filtered_derived("cluster_levels", cluster_levels, filters, stream=stream_cluster_levels)) )
+    else:
+        mapa = marker_map(df)
+
+    if density_metric != 'None':
+        # Restaurants aggregated in a quadtree grid, also computed once per version of the dataset and filters
+        density_layer( artifact("quadtree_grid", lambda: filtered_derived("quadtree_grid", quadtree_grid, filters, stream=stream_quadtree_grid)), density_metric ).add_to(mapa)
+    
+    with stage('folium_static', 'render'):
+        folium_static(mapa, width=1000, height=600)
 
-    locations = df[['latitude','longitude']].values.tolist()
-    popups = df[['city','restaurant_name','aggregate_rating']].values.tolist()
 
 
-    mapa = folium.Map(location=[center_latitude, center_longitude], zoom_start=2.4)
+with st.container():
+    # Container 03
+    st.markdown("## Nearby Restaurants")
 
-    marker_cluster = MarkerCluster(locations=locations, popups=popups)
-    marker_cluster.add_to(mapa)
-    
-    folium_static(mapa, width=1000, height=600)
\ No newline at end of file
+    if streamed:
+        st.info("The nearby search is off: the data is streamed in batches (ZOMATO_CHUNKSIZE), so the restaurants aren't in memory.")
+
+    else:
+        col1, col2, col3, col4 = st.columns(4)
+
+        with col1:
+            around = st.selectbox( 'Around', df['city'].drop_duplicates().astype(str).sort_values().tolist() )
+            center = df.loc[ df['city'] == around, ['latitude', 'longitude'] ].median()
+
+        with col2:
+            latitude = st.number_input( 'Latitude', -90.0, 90.0, float(center['latitude']), format='%.5f' )
+            longitude = st.number_input( 'Longitude', -180.0, 180.0, float(center['longitude']), format='%.5f' )
+
+        with col3:
+            query = st.radio( 'Find', ['Within a radius', 'Nearest'], horizontal=True )
+
+        with col4:
+            if query == 'Within a radius':
+                radius_km = st.slider( 'Radius (km)', 1, 50, 5 )
+            else:
+                nearest = st.slider( 'Restaurants', 1, 50, 10 )
+                radius_km = None
+
+        # Restaurants bucketed by grid cell once per version of the dataset and filters (rebuilt per run, in a
+        # few milliseconds, when served from artifacts); a query only measures the cells around the point.
+        index = SpatialIndex(df) if ARTIFACTS_DIR else filtered_derived("spatial_index", SpatialIndex, filters)
+
+        with stage('spatial_query'):
+            if radius_km:
+                positions, distances = index.within(latitude, longitude, radius_km)
+            else:
+                positions, distances = index.nearest(latitude, longitude, nearest)
+
+        nearby = df.take(positions).reset_index(drop=True).assign( distance_km=distances.round(2) )
+
+        col1, col2 = st.columns(2)
+
+        with col1:
+            st.markdown(f'### {len(nearby)} restaurants')
+            st.dataframe( adjust_df( nearby.loc[ : , ['restaurant_name', 'city', 'aggregate_rating', 'distance_km'] ] ) )
+
+        with col2:
+            # Markers of the 200 nearest at most
+            with stage('folium_static(nearby_map)', 'render'):
+                folium_static( nearby_map(nearby.head(200), latitude, longitude, radius_km), width=500, height=400 )
+
+
+
+# Stage timings: logged, and shown in the sidebar in debug mode
+finish_run(st.sidebar)
@@ -0,0 +1,30 @@
+# IMPORTS
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+
+# The app runs from the repository root (zomato.csv, currency_rates.json and img/ are relative to it).
+ROOT = os.path.dirname( os.path.dirname( os.path.abspath(__file__) ) )
+
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+
+
+@pytest.fixture(scope="session")
+def raw():
+    # zomato.csv as read from disk.
+    return pd.read_csv( os.path.join(ROOT, "zomato.csv") )
+
+
+
+@pytest.fixture(scope="session")
+def df(raw):
+    # The cleaned frame, with the app's dtypes (built here, without the snapshot or the process cache).
+    from zomato.data import clean_code
+    from zomato.schema import apply_schema
+
+    return apply_schema( clean_code(raw) )
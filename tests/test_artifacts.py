@@ -0,0 +1,13 @@
+# IMPORTS
+from zomato import artifacts
+
+
+
+def test_version_follows_the_result_code(monkeypatch):
+    # A change in the code computing the results (not only in the data or the cleaning) names a new version,
+    # so precompute doesn't keep the old one.
+    version = artifacts.dataset_version()
+    assert artifacts.dataset_version() == version
+
+    monkeypatch.setattr( artifacts, "RESULT_MODULES", artifacts.RESULT_MODULES + ("zomato.data",) )
+    assert artifacts.dataset_version() != version
@@ -0,0 +1,37 @@
+# IMPORTS
+import pytest
+
+from zomato.cube import build_cube
+from zomato.data import COUNTRIES
+
+
+
+@pytest.mark.parametrize("country", list(COUNTRIES.values()))
+def test_single_country_cube(df, country):
+    # A cube of one country's rows (as the sidebar filters build it: the frame's categories are kept) counts
+    # every city and cuisine right, also where the country has no excellent or online-delivery restaurant.
+    rows = df.loc[ df["country"] == country, : ].reset_index(drop=True)
+    cube = build_cube(rows)
+
+    assert cube["totals"]["restaurants"] == rows["restaurant_id"].nunique()
+    assert list( cube["countries"].index ) == [ country ]
+
+    excellent = rows.loc[ rows["aggregate_rating"] >= 4.5, : ].groupby("city", observed=True)["restaurant_id"].nunique()
+    expected = excellent.reindex( cube["cities"].index.astype(object), fill_value=0 )
+    assert cube["cities"]["excellent_restaurants"].tolist() == expected.tolist()
+
+    online = rows.loc[ rows["has_online_delivery"] == 1, : ].groupby("cuisines", observed=True)["restaurant_id"].nunique()
+    expected = online.reindex( cube["cuisines"].index.astype(object), fill_value=0 )
+    assert cube["cuisines"]["online_restaurants"].tolist() == expected.tolist()
+
+
+
+@pytest.mark.parametrize("online, label", [ (1, "Restaurants Online"), (0, "Restaurants Offline") ])
+def test_votes_chart_of_one_delivery_mode(df, online, label):
+    # With the online delivery filter set, the votes pie has the one slice of the rows left, named after it.
+    from zomato.rest_cuisines import votes_restaurants_voting_chart
+
+    cube = build_cube( df.loc[ df["has_online_delivery"] == online, : ].reset_index(drop=True) )
+    pie = votes_restaurants_voting_chart(cube).data[0]
+
+    assert list(pie.labels) == [ label ]
@@ -0,0 +1,56 @@
+# IMPORTS
+import threading
+
+import pandas as pd
+import pytest
+
+from zomato.data import cached, deduplicate
+
+
+
+def test_cached_builds_outside_the_lock(raw, tmp_path):
+    # While a value is being built, other values are served, and asking for the same one waits for that build.
+    path = str( tmp_path / "zomato.csv" )
+    raw.head(10).to_csv(path, index=False)
+
+    started, release = threading.Event(), threading.Event()
+    results, builds = [], []
+
+    def slow():
+        builds.append("slow")
+        started.set()
+        release.wait(30)
+        return "slow"
+
+    first = threading.Thread( target=lambda: results.append( cached("slow", slow, path) ) )
+    first.start()
+    assert started.wait(30)
+
+    other = threading.Thread( target=lambda: results.append( cached("fast", lambda: "fast", path) ) )
+    other.start()
+    other.join(10)
+    assert not other.is_alive()
+
+    again = threading.Thread( target=lambda: results.append( cached("slow", slow, path) ) )
+    again.start()
+    release.set()
+    first.join(30)
+    again.join(30)
+
+    assert sorted(results) == [ "fast", "slow", "slow" ]
+    assert builds == [ "slow" ]
+
+
+
+@pytest.mark.parametrize("votes, policy, kept", [ (999, "latest", [2]), (999, "max_votes", [1]), (999, "flag", [0, 1]),
+                                                  (5, "latest", [2]), (5, "max_votes", [2]), (5, "flag", [0, 1]) ])
+def test_dedup_copy_after_conflict(raw, votes, policy, kept):
+    # Rows A, B, A of one restaurant (B differs from A in votes or in address only): a copy of A later in the
+    # file is A's latest row, so it beats B under "latest" and among max_votes' ties.
+    a = raw.loc[ raw.notna().all(axis=1), : ].iloc[[0]].assign(Votes=5)
+    b = a.assign(Votes=votes) if votes != 5 else a.assign(Address="elsewhere")
+
+    df, report = deduplicate( pd.concat( [a, b, a], ignore_index=True ), policy )
+
+    assert list(df.index) == kept
+    assert report == { "duplicates": 1, "conflicts": 1, "conflict_rows": 2 }
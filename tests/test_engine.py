@@ -0,0 +1,29 @@
+# IMPORTS
+import pandas as pd
+import pytest
+
+from zomato.cube import cube_partial, finish_cube
+from zomato.data import COUNTRIES
+from zomato.engine import query_engine
+
+
+pytest.importorskip("duckdb")
+
+
+
+@pytest.mark.parametrize("country", [ None ] + list(COUNTRIES.values()))
+def test_duckdb_cube_matches_pandas(df, country):
+    # The cube DuckDB builds is the one pandas builds, table by table and dtype by dtype, over the whole frame
+    # and over one country's rows (whose categorical columns keep categories no row has).
+    rows = df if country is None else df.loc[ df["country"] == country, : ].reset_index(drop=True)
+
+    expected = finish_cube( cube_partial( rows, query_engine("pandas") ) )
+    cube = finish_cube( cube_partial( rows, query_engine("duckdb") ) )
+    assert query_engine("duckdb").name == "duckdb"
+
+    assert cube.keys() == expected.keys()
+    for name, table in expected.items():
+        if isinstance(table, pd.DataFrame):
+            pd.testing.assert_frame_equal( cube[name], table, obj=name )
+        else:
+            assert cube[name] == table
@@ -0,0 +1,13 @@
+# IMPORTS
+from zomato import figcache
+from zomato.geographic import cities_restaurant_pop_chart
+
+
+
+def test_figure_key_follows_the_cube_code(monkeypatch):
+    # A change in the code the cube is built with (not only in the chart function) gives new figure keys.
+    key = figcache.figure_key( cities_restaurant_pop_chart, "version", {} )
+    assert figcache.figure_key( cities_restaurant_pop_chart, "version", {} ) == key
+
+    monkeypatch.setattr( figcache, "CUBE_MODULES", figcache.CUBE_MODULES + ("zomato.data",) )
+    assert figcache.figure_key( cities_restaurant_pop_chart, "version", {} ) != key
@@ -0,0 +1,44 @@
+# IMPORTS
+import threading
+
+import pytest
+
+pytest.importorskip("streamlit")
+
+from zomato.filters import filtered_derived, filtered_frame
+
+
+
+def test_selection_builds_outside_the_lock(raw, tmp_path):
+    # While something is built for one selection, other selections are filtered, and asking for the same
+    # thing waits for that build.
+    path = str( tmp_path / "zomato.csv" )
+    raw.to_csv(path, index=False)
+    brazil, india = { "country": [ "Brazil" ] }, { "country": [ "India" ] }
+
+    started, release = threading.Event(), threading.Event()
+    results, builds = [], []
+
+    def slow(df):
+        builds.append( len(df) )
+        started.set()
+        release.wait(30)
+        return len(df)
+
+    first = threading.Thread( target=lambda: results.append( filtered_derived("slow", slow, brazil, path) ) )
+    first.start()
+    assert started.wait(30)
+
+    other = threading.Thread( target=lambda: results.append( len( filtered_frame(india, path) ) ) )
+    other.start()
+    other.join(10)
+    assert not other.is_alive()
+
+    again = threading.Thread( target=lambda: results.append( filtered_derived("slow", slow, brazil, path) ) )
+    again.start()
+    release.set()
+    first.join(30)
+    again.join(30)
+
+    assert len(builds) == 1
+    assert sorted(results) == sorted( [ builds[0], builds[0], len( filtered_frame(india, path) ) ] )
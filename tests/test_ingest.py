@@ -0,0 +1,38 @@
+# IMPORTS
+import functools
+
+import pandas as pd
+import pytest
+
+from zomato import data
+from zomato.ingest import read_batches
+
+
+
+@pytest.fixture
+def conflicts_csv(raw, tmp_path):
+    # zomato.csv with, at its end (far from their first rows), a conflicting row of three restaurants, a copy
+    # of a conflicting row, and a conflicting row followed by a copy of the restaurant's first row.
+    rows = raw.loc[ raw.notna().all(axis=1), : ].drop_duplicates().reset_index(drop=True)
+
+    more = rows.iloc[[0]].assign(Votes=10**6)
+    fewer = rows.iloc[[1]].assign(Votes=0)
+    moved = rows.iloc[[2]].assign(Address="elsewhere")
+    voted, first = rows.iloc[[3]].assign(Votes=10**6), rows.iloc[[3]]
+
+    path = tmp_path / "conflicts.csv"
+    pd.concat( [raw, more, fewer, moved, more, voted, first], ignore_index=True ).to_csv(path, index=False)
+    return str(path)
+
+
+
+@pytest.mark.parametrize("policy", data.DEDUP_POLICIES)
+def test_batches_dedup_across_batches(conflicts_csv, monkeypatch, policy):
+    # The batches hold the rows clean_code keeps from the whole file, with conflicts split across batches.
+    monkeypatch.setattr( data, "deduplicate", functools.partial(data.deduplicate, policy=policy) )
+
+    expected = data.clean_code( pd.read_csv(conflicts_csv) )
+    streamed = pd.concat( read_batches(conflicts_csv, chunksize=1000), ignore_index=True )
+
+    key = list(expected.columns)
+    pd.testing.assert_frame_equal( streamed.sort_values(key).reset_index(drop=True), expected.sort_values(key).reset_index(drop=True) )
@@ -0,0 +1,16 @@
+# IMPORTS
+import pandas as pd
+import pytest
+
+pytest.importorskip("folium")
+
+from zomato.grid import quadtree_grid, stream_quadtree_grid
+from zomato.maps import cluster_levels, stream_cluster_levels
+
+
+
+@pytest.mark.parametrize("chunksize", [1000, 3333])
+def test_streamed_map_layers(df, chunksize):
+    # The clusters and the density grid streamed from the CSV's batches are those of the whole cleaned frame.
+    assert stream_cluster_levels("zomato.csv", chunksize) == cluster_levels(df)
+    pd.testing.assert_frame_equal( stream_quadtree_grid("zomato.csv", chunksize), quadtree_grid(df), check_exact=False, rtol=1e-12 )
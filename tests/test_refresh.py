@@ -0,0 +1,56 @@
+# IMPORTS
+import logging
+
+import pandas as pd
+
+from zomato import refresh as refresh_module
+from zomato.cube import build_cube, load_cube
+from zomato.data import load_data
+from zomato.refresh import refresh
+
+
+
+def test_known_restaurants_are_updated(raw, tmp_path):
+    # A delta row about a restaurant of the dataset (here with new votes and rating) replaces its row, in the frame
+    # and in the cube's sums and counts, next to the new restaurant added; a row sent again unchanged is left alone.
+    path = tmp_path / "zomato.csv"
+    raw.iloc[:5000].to_csv(path, index=False)
+    df = load_data( str(path) )
+    old_votes = df.loc[ df["restaurant_id"] == raw.loc[100, "Restaurant ID"], "votes" ].sum()
+
+    delta = tmp_path / "delta.csv"
+    rows = raw.iloc[ [5000, 100, 200] ].copy()
+    rows["Votes"] = [ 7, 10**6, raw.loc[200, "Votes"] ]
+    rows["Aggregate rating"] = [ 4.0, 4.9, raw.loc[200, "Aggregate rating"] ]
+    rows.to_csv(delta, index=False)
+
+    report = refresh( str(delta), str(path), snapshot=False )
+
+    assert report["known_restaurants"] == 2 and report["updated_restaurants"] == 1 and report["added_rows"] == 1
+    updated = load_data( str(path) )
+    assert updated["votes"].sum() == df["votes"].sum() - old_votes + 10**6 + 7
+    assert len(updated) == len(df) + 1
+
+    cube, rebuilt = load_cube( str(path) ), build_cube(updated)
+    for table in ["base", "countries", "cities", "cuisines"]:
+        pd.testing.assert_frame_equal( cube[table], rebuilt[table], check_exact=False, rtol=1e-12 )
+    assert cube["totals"] == rebuilt["totals"]
+
+
+
+def test_known_restaurants_are_skipped_without_latest_policy(raw, tmp_path, caplog, monkeypatch):
+    # Under a policy where a rebuild could keep the old row, updates are skipped and reported.
+    monkeypatch.setattr(refresh_module, "DEDUP_POLICY", "max_votes")
+    path = tmp_path / "zomato.csv"
+    raw.iloc[:5000].to_csv(path, index=False)
+    votes = load_data( str(path) )["votes"].sum()
+
+    delta = tmp_path / "delta.csv"
+    raw.iloc[ [5000, 100] ].assign( Votes=[ 7, 10**6 ] ).to_csv(delta, index=False)
+
+    with caplog.at_level(logging.WARNING, logger="zomato.refresh"):
+        report = refresh( str(delta), str(path), snapshot=False )
+
+    assert report["known_restaurants"] == 1 and report["added_rows"] == 1 and report["updated_restaurants"] == 0
+    assert str( raw.loc[100, "Restaurant ID"] ) in caplog.text
+    assert load_data( str(path) )["votes"].sum() == votes + 7
@@ -0,0 +1,20 @@
+# IMPORTS
+import json
+import os
+
+from zomato.reports import generate_reports
+
+
+
+def test_no_countries(raw, tmp_path):
+    # A dataset without a restaurant in any country of the map still gets a (report-less) version, workers or not.
+    csv = tmp_path / "unmapped.csv"
+    raw.head(20).assign( **{ "Country Code": 999 } ).to_csv(csv, index=False)
+
+    for workers in (2, 0):
+        directory = generate_reports( str(csv), str(tmp_path / "reports"), workers=workers )
+
+        with open( os.path.join(directory, "manifest.json") ) as f:
+            assert json.load(f)["reports"] == []
+
+        assert os.listdir(directory) == [ "manifest.json" ]
@@ -0,0 +1,65 @@
+# IMPORTS
+import numpy as np
+import pandas as pd
+import pytest
+from haversine import Unit, haversine_vector
+
+from zomato.spatial import SpatialIndex, great_circle_km
+
+
+# Search radii of the queries, in km: from inside one cell to more than half the Earth around.
+RADII_KM = [ 1, 10, 100, 1000, 5000, 25000 ]
+
+# Queries where the grid wraps or narrows: across the antimeridian, at and near both poles, on cell edges.
+EDGE_QUERIES = [ (0.0, 179.9), (0.0, -179.95), (-36.85, 179.99), (65.0, -180.0), (89.5, 10.0), (90.0, 0.0),
+                 (-89.9, 135.0), (-90.0, -45.0), (28.5, 77.25) ]
+
+
+
+@pytest.fixture(scope="module")
+def points(df):
+    # The restaurants of the dataset, with random points over the whole globe and clusters at the antimeridian
+    # and the poles, where the grid's cells are narrowest or wrap around.
+    rng = np.random.default_rng(0)
+    extra = 3000
+    latitudes = np.r_[ df["latitude"].to_numpy(dtype=np.float64), np.degrees( np.arcsin( rng.uniform(-1, 1, extra) ) ),
+                       rng.uniform(-60, 60, 300), rng.uniform(88, 90, 300), rng.uniform(-90, -88, 300) ]
+    longitudes = np.r_[ df["longitude"].to_numpy(dtype=np.float64), rng.uniform(-180, 180, extra),
+                        rng.choice( [-1, 1], 300 ) * rng.uniform(179, 180, 300), rng.uniform(-180, 180, 600) ]
+    return pd.DataFrame( { "latitude": latitudes, "longitude": longitudes } )
+
+
+
+def queries():
+    # EDGE_QUERIES and random points spread evenly over the sphere.
+    rng = np.random.default_rng(1)
+    random = zip( np.degrees( np.arcsin( rng.uniform(-1, 1, 40) ) ), rng.uniform(-180, 180, 40) )
+    return EDGE_QUERIES + [ (float(lat), float(lon)) for lat, lon in random ]
+
+
+
+def test_great_circle_matches_haversine(points):
+    # The vectorized distance is the haversine package's, which the brute-force checks below rely on.
+    latitudes, longitudes = points["latitude"].to_numpy(), points["longitude"].to_numpy()
+    for lat, lon in EDGE_QUERIES:
+        expected = haversine_vector( np.array( [[lat, lon]] ), np.c_[latitudes, longitudes], Unit.KILOMETERS, comb=True ).ravel()
+        np.testing.assert_allclose( great_circle_km(lat, lon, latitudes, longitudes), expected, rtol=1e-9, atol=1e-6 )
+
+
+
+@pytest.mark.parametrize("lat, lon", queries())
+def test_within_and_nearest_match_brute_force(points, lat, lon):
+    # Every query returns what measuring the distance to every point returns: the same points within the
+    # radius, and the k nearest distances, nearest first.
+    index = SpatialIndex(points)
+    distances = great_circle_km( lat, lon, points["latitude"].to_numpy(), points["longitude"].to_numpy() )
+
+    for radius_km in RADII_KM:
+        positions, found = index.within(lat, lon, radius_km)
+        assert sorted(positions) == sorted( np.flatnonzero(distances <= radius_km) )
+        assert np.all( np.diff(found) >= 0 )
+
+    for k in [ 1, 10, 100 ]:
+        positions, found = index.nearest(lat, lon, k)
+        np.testing.assert_array_equal( found, np.sort(distances)[:k] )
+        np.testing.assert_array_equal( distances[positions], found )
@@ -0,0 +1,260 @@
+# Precomputed tables and figures of every page, so the app can serve them without touching the data.
+#
+#   python -m zomato.artifacts                      # clean zomato.csv once and write artifacts/<version>/
+#   ZOMATO_ARTIFACTS=artifacts streamlit run Home.py
+#
+# Each version directory holds one file per result (Parquet for tables, Plotly JSON for figures, JSON for the
+# rest) and a manifest.json; artifacts/LATEST names the version the pages read. A version is named after the
+# CSV's hash, the currency rates' hash, the cleaning code's version and a hash of the code computing the results,
+# so a new dataset, new rates or a change in cleaning, in a page function or in the cube gets a new directory.
+
+# IMPORTS
+import argparse
+import inspect
+import json
+import os
+import shutil
+import sys
+import threading
+import time
+
+import pandas as pd
+
+from zomato import geographic, rest_cuisines
+from zomato.cube import MULTI_CUISINE, load_cube
+from zomato.data import CSV_PATH, cleaning_version, data_key, load_data, load_derived
+from zomato.figcache import CUBE_MODULES, cached_result, modules_version
+from zomato.lazy import LazyModule
+from zomato.profiling import stage
+
+
+# Only needed once a figure is written or read back.
+go = LazyModule("plotly.graph_objects")
+pio = LazyModule("plotly.io")
+
+
+# Serve the pages from the artifacts in this directory instead of computing them.
+ARTIFACTS_DIR = os.environ.get("ZOMATO_ARTIFACTS")
+
+DEFAULT_DIR = "artifacts"
+
+# Versions kept by the CLI, newest first; older ones are deleted.
+KEEP_VERSIONS = 3
+
+# Modules the artifacts are computed with (the page functions, the cube and the map layers, see precompute).
+RESULT_MODULES = CUBE_MODULES + ( "zomato.artifacts", "zomato.geographic", "zomato.grid", "zomato.maps", "zomato.rest_cuisines" )
+
+# Columns of the cleaned frame the world map needs (one marker per restaurant).
+MARKER_COLUMNS = [ "latitude", "longitude", "city", "restaurant_name", "aggregate_rating" ]
+
+# Files read so far, by (directory, version, name). Figures are kept as JSON text and rebuilt on every
+# read, because the pages may change them (update_layout).
+_loaded = {}
+_lock = threading.Lock()
+
+
+
+# RESULTS
+# ==============================================================================================================================================
+
+def page_functions():
+    # {name: function(cube)} of every table and chart function of the pages.
+    functions = {}
+
+    for module in (geographic, rest_cuisines):
+        for name, function in inspect.getmembers(module, inspect.isfunction):
+            if function.__module__ == module.__name__:
+                functions[name] = function
+
+    return functions
+
+
+
+def artifact(name, build):
+    # The precomputed result `name` in artifact mode (ZOMATO_ARTIFACTS), otherwise build().
+    if not ARTIFACTS_DIR:
+        return build()
+
+    with stage(name, "artifact"):
+        return read_artifact(ARTIFACTS_DIR, name)
+
+
+
+def result(function, cube, filters=None, layout=None):
+    # function(cube), with layout applied when it returns a figure: precomputed in artifact mode, otherwise
+    # reused from the figure cache for the current version of the dataset and filters (cube is their cube).
+    if not ARTIFACTS_DIR:
+        return cached_result( function, cube, data_version(filters), layout )
+
+    value = artifact( function.__name__, None )
+    if layout:
+        value.update_layout(**layout)
+
+    return value
+
+
+
+# WRITING
+# ==============================================================================================================================================
+
+def write_artifact(directory, name, value):
+    # Write value to directory and return its manifest entry.
+    if isinstance(value, pd.DataFrame):
+        entry = { "format": "parquet", "file": f"{name}.parquet" }
+        value.to_parquet( os.path.join(directory, entry["file"]) )
+
+    elif isinstance(value, go.Figure):
+        entry = { "format": "plotly", "file": f"{name}.json" }
+        with open(os.path.join(directory, entry["file"]), "w", encoding="utf-8") as f:
+            f.write( value.to_json() )
+
+    else:
+        # Dicts are stored as [key, value] pairs, so integer keys stay integers.
+        entry = { "format": "json", "file": f"{name}.json" }
+        with open(os.path.join(directory, entry["file"]), "w", encoding="utf-8") as f:
+            json.dump( list(value.items()), f, default=lambda v: v.item() )
+
+    return entry
+
+
+
+def dataset_version(path=CSV_PATH):
+    # Name of the artifacts of the current CSV, currency rates, cleaning code and result code (and cuisine mode,
+    # see zomato.cube).
+    _, _, _, sha, rates = data_key(path)
+    return f"{sha[:12]}-{rates[:8]}-{cleaning_version()}-{modules_version(*RESULT_MODULES)[:8]}" + ( "-multi-cuisine" if MULTI_CUISINE else "" )
+
+
+
+def data_version(filters=None, path=CSV_PATH):
+    # Version of the data a page shows: the dataset's, plus the sidebar filters ({column: [values]}) when set.
+    if not filters:
+        return dataset_version(path)
+
+    return dataset_version(path) + ":" + json.dumps( sorted( (col, sorted(values)) for col, values in filters.items() ),
+                                                     default=lambda v: v.item() )
+
+
+
+def precompute(path=CSV_PATH, out=DEFAULT_DIR, keep=KEEP_VERSIONS, force=False):
+    # Clean the dataset once, evaluate every page result and write them as a new version; returns its directory.
+    # The map modules (folium) are only needed here, not by the pages that read artifacts.
+    from zomato.grid import quadtree_grid
+    from zomato.maps import cluster_levels
+
+    version = dataset_version(path)
+    directory = os.path.join(out, version)
+
+    if os.path.exists( os.path.join(directory, "manifest.json") ) and not force:
+        set_latest(out, version)
+        return directory
+
+    df = load_data(path)
+    cube = load_cube(path)
+
+    results = { name: (lambda function=function: function(cube)) for name, function in page_functions().items() }
+    results.update( { "totals": lambda: cube["totals"],
+                      "markers": lambda: df.loc[ : , MARKER_COLUMNS ],
+                      "cluster_levels": lambda: load_derived("cluster_levels", cluster_levels, path),
+                      "quadtree_grid": lambda: load_derived("quadtree_grid", quadtree_grid, path) } )
+
+    # Written to a temporary directory first, so readers never see a half-written version.
+    tmp = directory + ".tmp"
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+
+    manifest = { "version": version, "source": os.path.abspath(path), "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                 "artifacts": { name: write_artifact(tmp, name, build()) for name, build in results.items() } }
+
+    with open(os.path.join(tmp, "manifest.json"), "w") as f:
+        json.dump(manifest, f, indent=1)
+
+    shutil.rmtree(directory, ignore_errors=True)
+    os.replace(tmp, directory)
+    set_latest(out, version)
+    prune(out, keep)
+
+    return directory
+
+
+
+def set_latest(out, version):
+    # Point out/LATEST at version, atomically (readers see the old version or the new one).
+    tmp = os.path.join(out, "LATEST.tmp")
+    with open(tmp, "w") as f:
+        f.write(version)
+    os.replace( tmp, os.path.join(out, "LATEST") )
+
+
+
+def prune(out, keep):
+    # Delete all but the `keep` most recent versions (the latest one is always kept).
+    with open(os.path.join(out, "LATEST")) as f:
+        latest = f.read().strip()
+
+    versions = sorted( ( entry for entry in os.scandir(out) if entry.is_dir() and entry.name != latest ),
+                       key=lambda entry: entry.stat().st_mtime, reverse=True )
+
+    for entry in versions[ max(keep - 1, 0): ]:
+        shutil.rmtree(entry.path, ignore_errors=True)
+
+
+
+# READING
+# ==============================================================================================================================================
+
+def latest_version(out):
+    with open(os.path.join(out, "LATEST")) as f:
+        return f.read().strip()
+
+
+
+def read_artifact(out, name):
+    # The artifact `name` of the latest version in out. Files are read once per version and process.
+    version = latest_version(out)
+    key = (os.path.abspath(out), version, name)
+
+    with _lock:
+        if key not in _loaded:
+            directory = os.path.join(out, version)
+            with open(os.path.join(directory, "manifest.json")) as f:
+                entry = json.load(f)["artifacts"][name]
+
+            file = os.path.join(directory, entry["file"])
+
+            if entry["format"] == "parquet":
+                value = pd.read_parquet(file)
+            elif entry["format"] == "plotly":
+                with open(file, encoding="utf-8") as f:
+                    value = f.read()
+            else:
+                with open(file, encoding="utf-8") as f:
+                    value = dict( json.load(f) )
+
+            # Drop what was read from older versions.
+            for old in [ k for k in _loaded if k[0] == key[0] and k[1] != version ]:
+                del _loaded[old]
+
+            _loaded[key] = (entry["format"], value)
+
+        kind, value = _loaded[key]
+
+    return pio.from_json(value) if kind == "plotly" else value
+
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Precompute every table and figure of the pages.")
+    parser.add_argument("--csv", default=CSV_PATH, help="dataset to precompute")
+    parser.add_argument("--out", default=DEFAULT_DIR, help="artifacts directory")
+    parser.add_argument("--keep", type=int, default=KEEP_VERSIONS, help="versions to keep")
+    parser.add_argument("--force", action="store_true", help="rewrite the version even if it exists")
+    args = parser.parse_args(argv)
+
+    print( precompute(args.csv, args.out, args.keep, args.force) )
+    return 0
+
+
+
+if __name__ == "__main__":
+    sys.exit( main() )
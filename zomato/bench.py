@@ -0,0 +1,293 @@
+# Benchmarks of the cleaning step and of every function that feeds the pages, at scaled data sizes.
+#
+#   python -m zomato.bench                                  # 1x, 10x and 100x zomato.csv, compared to the stored baseline
+#   python -m zomato.bench --scales 1 10 --repeat 5
+#   python -m zomato.bench --save-baseline                  # store this run as the new baseline
+#   python -m zomato.bench --profile profile.json --scales 100 1000   # synthetic data (see zomato.synthetic)
+#   python -m zomato.bench --imports                        # cold import time of Home.py and every page, by package
+#
+# Results are written as JSON (--output); regressions against the baseline are flagged, and with
+# --fail-on-regression the exit code is 1 when any function got slower than --threshold times its baseline.
+
+# IMPORTS
+import argparse
+import ast
+import glob
+import json
+import math
+import os
+import platform
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+from zomato.artifacts import page_functions
+from zomato.cube import build_cube, cube_partial, stream_cube
+from zomato.data import CSV_PATH, clean_code, convert_currency, load_rates
+from zomato.engine import available_engines, query_engine
+from zomato.grid import quadtree_grid
+from zomato.maps import cluster_levels, cluster_map, marker_map
+from zomato.schema import apply_schema
+from zomato.snapshot import read_snapshot, write_snapshot
+from zomato.synthetic import load_profile, write_csv
+
+
+BASELINE_PATH = os.path.join('benchmarks', 'baseline.json')
+
+DEFAULT_SCALES = [ 1, 10, 100 ]
+
+# Restaurant IDs of the k-th copy of the data are shifted by k * ID_OFFSET, so copies are new restaurants.
+ID_OFFSET = 100_000_000
+
+# Scripts whose imports are timed by --imports.
+SCRIPTS = [ 'Home.py' ] + sorted( glob.glob( os.path.join('pages', '*.py') ) )
+
+# One line of `python -X importtime`: self and cumulative microseconds, then the module indented by its depth.
+IMPORTTIME_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)$')
+
+
+
+# SCALED DATA
+# ==============================================================================================================================================
+
+def scaled_csv(factor, directory, source=CSV_PATH):
+    # Write `factor` copies of the source CSV (with distinct restaurant IDs) to directory and return its path.
+    raw = pd.read_csv(source)
+    path = os.path.join(directory, f'zomato_x{factor}.csv')
+
+    for k in range(factor):
+        copy = raw.assign( **{ 'Restaurant ID': raw['Restaurant ID'] + k * ID_OFFSET } )
+        copy.to_csv(path, mode='w' if k == 0 else 'a', header=(k == 0), index=False)
+
+    return path
+
+
+
+def synthetic_csv(factor, directory, profile):
+    # Write a synthetic CSV with `factor` times the rows the profile was learned from and return its path.
+    path = os.path.join(directory, f'synthetic_x{factor}.csv')
+    return write_csv( profile, factor * profile['rows'], path )
+
+
+
+# BENCHMARKS
+# ==============================================================================================================================================
+
+def benchmarks(path, directory):
+    # (name, key, function(state)) in pipeline order. When key is set, the result is kept in state[key]
+    # for the steps after it.
+    snapshot = os.path.join(directory, 'bench.clean.parquet')
+
+    steps = [ ('read_csv', 'raw', lambda state: pd.read_csv(path)),
+              ('clean_code', 'clean', lambda state: clean_code(state['raw'])),
+              ('apply_schema', 'df', lambda state: apply_schema(state['clean'])),
+              ('convert_currency', None, lambda state: convert_currency(state['df'], load_rates())),
+              ('snapshot_write', None, lambda state: write_snapshot(state['df'], snapshot, {})),
+              ('snapshot_read', None, lambda state: read_snapshot(snapshot, {})),
+              ('build_cube', 'cube', lambda state: build_cube(state['df'])),
+              ('stream_cube', None, lambda state: stream_cube(path)) ]
+
+    # The cube's grouping pass on every query engine installed.
+    for engine in available_engines():
+        steps.append( (f'cube_partial[{engine}]', None, lambda state, engine=engine: cube_partial(state['df'], query_engine(engine))) )
+
+    for name, function in page_functions().items():
+        steps.append( (name, None, lambda state, function=function: function(state['cube'])) )
+
+    steps += [ ('cluster_levels', 'levels', lambda state: cluster_levels(state['df'])),
+               ('cluster_map', None, lambda state: cluster_map(state['df'], state['levels']).get_root().render()),
+               ('marker_map', None, lambda state: marker_map(state['df']).get_root().render()),
+               ('quadtree_grid', None, lambda state: quadtree_grid(state['df'])) ]
+
+    return steps
+
+
+
+def time_function(function, repeat):
+    # Result of the last call and the wall-clock seconds of each of `repeat` calls.
+    timings = []
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        timings.append( time.perf_counter() - start )
+
+    return result, timings
+
+
+
+def run(scales=DEFAULT_SCALES, repeat=3, only=None, profile=None):
+    # Time every benchmark (or only the named ones) at every scale; returns the JSON-serializable results.
+    # The data is copies of zomato.csv, or synthetic rows of a zomato.synthetic profile when one is given.
+    results = []
+
+    with tempfile.TemporaryDirectory() as directory:
+        for scale in scales:
+            path = scaled_csv(scale, directory) if profile is None else synthetic_csv(scale, directory, profile)
+            rows = sum(1 for _ in open(path, encoding='utf-8')) - 1
+            state = {}
+
+            for name, key, function in benchmarks(path, directory):
+                if only and name not in only:
+                    # Not timed, but later steps may need its result.
+                    if key is not None:
+                        state[key] = function(state)
+                    continue
+
+                result, timings = time_function( lambda: function(state), repeat )
+                if key is not None:
+                    state[key] = result
+
+                results.append( { 'name': name, 'scale': scale, 'rows': rows,
+                                  'min_s': min(timings), 'median_s': statistics.median(timings), 'repeat': repeat } )
+
+                print(f'{name:<45} x{scale:<4} {min(timings):>10.4f}s', file=sys.stderr)
+
+    return { 'meta': { 'python': platform.python_version(), 'pandas': pd.__version__, 'machine': platform.machine(),
+                       'processor': platform.processor(), 'cpus': os.cpu_count(), 'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                       'data': 'copies' if profile is None else 'synthetic', 'engine': query_engine().name },
+             'results': results }
+
+
+
+# IMPORT TIMES
+# ==============================================================================================================================================
+
+def script_imports(script):
+    # Source of the import statements at the top level of a script: what a cold worker runs before the page.
+    with open(script, encoding='utf-8') as f:
+        source = f.read()
+
+    return '\n'.join( ast.get_source_segment(source, node) for node in ast.parse(source).body
+                      if isinstance(node, (ast.Import, ast.ImportFrom)) )
+
+
+
+def import_times(code):
+    # Every module a fresh interpreter imports to run code, as reported by -X importtime:
+    # [{'module', 'depth', 'self_s', 'cumulative_s'}] in the order they finished importing.
+    process = subprocess.run( [sys.executable, '-X', 'importtime', '-c', code], capture_output=True, text=True )
+    if process.returncode != 0:
+        raise RuntimeError( process.stderr.strip().splitlines()[-1] )
+
+    modules = []
+    for line in process.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            modules.append( { 'module': match.group(4), 'depth': len(match.group(3)) // 2,
+                              'self_s': int(match.group(1)) / 1e6, 'cumulative_s': int(match.group(2)) / 1e6 } )
+
+    return modules
+
+
+
+def import_report(scripts=SCRIPTS, repeat=3, top=8):
+    # Cold import time of each script (the fastest of `repeat` fresh interpreters) and the packages
+    # (top-level names) that took the longest, with the time spent in their own modules.
+    report = []
+
+    for script in scripts:
+        runs = [ import_times( script_imports(script) ) for _ in range(repeat) ]
+        modules = pd.DataFrame( min( runs, key=lambda modules: sum( m['self_s'] for m in modules ) ) )
+        packages = modules['self_s'].groupby( modules['module'].str.split('.').str[0] ).sum().sort_values(ascending=False)
+
+        report.append( { 'script': script, 'total_s': round( float(modules['self_s'].sum()), 4 ), 'modules': len(modules),
+                         'packages': { name: round( float(seconds), 4 ) for name, seconds in packages.head(top).items() } } )
+
+        print(f'{script:<45} {modules["self_s"].sum():>8.3f}s  {len(modules):>5} modules', file=sys.stderr)
+
+    return report
+
+
+
+# REPORTS
+# ==============================================================================================================================================
+
+def scaling(results):
+    # Growth exponent of each function between its smallest and largest scale: ~1 is linear, ~0 constant, >1 superlinear.
+    df = pd.DataFrame(results['results'])
+    rows = []
+
+    for name, timings in df.groupby('name', sort=False):
+        first, last = timings.loc[ timings['scale'].idxmin() ], timings.loc[ timings['scale'].idxmax() ]
+
+        if last['scale'] > first['scale'] and first['min_s'] > 0:
+            exponent = math.log( last['min_s'] / first['min_s'] ) / math.log( last['scale'] / first['scale'] )
+            rows.append( { 'name': name, 'from_scale': first['scale'], 'to_scale': last['scale'], 'exponent': round(exponent, 2) } )
+
+    return pd.DataFrame(rows, columns=['name', 'from_scale', 'to_scale', 'exponent'])
+
+
+
+def compare(results, baseline, threshold=1.25):
+    # Current vs baseline min time of every (name, scale) in both runs; `regression` when ratio > threshold.
+    current = pd.DataFrame(results['results']).set_index( ['name', 'scale'] )['min_s']
+    previous = pd.DataFrame(baseline['results']).set_index( ['name', 'scale'] )['min_s']
+
+    report = pd.concat( [previous.rename('baseline_s'), current.rename('current_s')], axis=1, join='inner' ).reset_index()
+    report['ratio'] = report['current_s'] / report['baseline_s']
+    report['regression'] = report['ratio'] > threshold
+
+    return report
+
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the cleaning step and the page functions at scaled data sizes.')
+    parser.add_argument('--scales', type=int, nargs='+', default=DEFAULT_SCALES, help='multiples of zomato.csv to run at')
+    parser.add_argument('--repeat', type=int, default=3, help='timed calls per benchmark (the minimum is reported)')
+    parser.add_argument('--only', nargs='+', help='benchmark names to run (their inputs are always built)')
+    parser.add_argument('--profile', help='run on synthetic data generated from this zomato.synthetic profile')
+    parser.add_argument('--output', default='bench_results.json', help='where to write the JSON results')
+    parser.add_argument('--baseline', default=BASELINE_PATH, help='baseline results to compare against')
+    parser.add_argument('--save-baseline', action='store_true', help='also store these results as the baseline')
+    parser.add_argument('--threshold', type=float, default=1.25, help='slowdown ratio reported as a regression')
+    parser.add_argument('--fail-on-regression', action='store_true', help='exit with status 1 on any regression')
+    parser.add_argument('--imports', action='store_true', help='only report the import time of Home.py and the pages')
+    args = parser.parse_args(argv)
+
+    if args.imports:
+        report = import_report(repeat=args.repeat)
+        with open(args.output, 'w') as f:
+            json.dump( { 'imports': report }, f, indent=1 )
+
+        print('\nSlowest packages per script (seconds in their own modules):')
+        for entry in report:
+            print( f"{entry['script']}: " + ', '.join( f'{name} {seconds:.3f}' for name, seconds in entry['packages'].items() ) )
+        return 0
+
+    results = run( args.scales, args.repeat, args.only, load_profile(args.profile) if args.profile else None )
+    results['scaling'] = scaling(results).to_dict('records')
+
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=1)
+
+    pd.set_option('display.width', 200)
+    print('\nScaling (time growth exponent per function):')
+    print( scaling(results).sort_values('exponent', ascending=False).to_string(index=False) )
+
+    regressions = 0
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline) as f:
+            report = compare( results, json.load(f), args.threshold )
+
+        regressions = int( report['regression'].sum() )
+        print(f'\nAgainst baseline {args.baseline} ({regressions} regressions):')
+        print( report.to_string(index=False, float_format='{:.4f}'.format) )
+
+    if args.save_baseline:
+        os.makedirs( os.path.dirname(args.baseline) or '.', exist_ok=True )
+        with open(args.baseline, 'w') as f:
+            json.dump(results, f, indent=1)
+
+    return 1 if (args.fail_on_regression and regressions) else 0
+
+
+
+if __name__ == '__main__':
+    sys.exit( main() )
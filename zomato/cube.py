@@ -0,0 +1,273 @@
+# IMPORTS
+import os
+
+import numpy as np
+import pandas as pd
+
+from zomato.cuisines import CuisineIndex
+from zomato.data import CSV_PATH, cached, load_derived
+from zomato.engine import query_engine
+from zomato.ingest import CHUNKSIZE, DEFAULT_CHUNKSIZE, fold_batches
+from zomato.schema import INT8_COLUMNS, union_categories
+
+
+# Count every restaurant under each cuisine it lists, not only under the first one (see multi_cuisine_cube).
+MULTI_CUISINE = os.environ.get("ZOMATO_MULTI_CUISINE", "") not in ("", "0")
+
+# The cube is streamed from the CSV in batches (see load_cube), and the whole frame is never loaded for it.
+STREAMED = bool(CHUNKSIZE) and not MULTI_CUISINE
+
+# Restaurants rated at least this are counted as "Excellent".
+EXCELLENT_RATING = 4.5
+
+# Finest grain every page aggregation can be rolled up from.
+BASE_KEYS = [ "country", "city", "cuisines", "has_online_delivery", "has_table_booking", "is_delivering_now" ]
+
+# Additive measures kept at the BASE_KEYS grain.
+MEASURES = [ "rows", "votes", "rating_sum", "cost_sum", "delivering_rows" ]
+
+# Their dtypes, whatever the engine (and pandas version) that summed them.
+MEASURE_DTYPES = { "rows": "int64", "votes": "int64", "rating_sum": "float64", "cost_sum": "float64", "delivering_rows": "int64" }
+
+# Float sums are rounded to this many decimals, so they don't depend on the order the engine added them in
+# (ratings have 1 decimal and dollar costs, integer costs times rates, at most 6).
+SUM_DECIMALS = 6
+
+# Columns needed for the distinct restaurant counts.
+RESTAURANT_KEYS = [ "restaurant_id", "country", "city", "cuisines", "has_online_delivery", "excellent" ]
+
+
+
+# AGGREGATE CUBE
+# ==============================================================================================================================================
+
+# A cube is built in two steps: cube_partial() reduces a frame (or a batch of one) to mergeable
+# partial aggregates, and finish_cube() turns them into the tables the pages read.
+
+def cube_partial(df, engine=None):
+    # Partial aggregates of df, from a single grouping pass over the data, run by engine (the configured query
+    # engine by default, see zomato.engine).
+    engine = engine or query_engine()
+
+    base = engine.group_sums( df, BASE_KEYS, { "rows": ("restaurant_id", "size"), "votes": ("votes", "sum"),
+                                               "rating_sum": ("aggregate_rating", "sum"),
+                                               "cost_sum": ("dollar_average_cost_for_two", "sum"),
+                                               "delivering_rows": ("is_delivering_now", "sum") } )
+    base = _measures( base.astype( { key: df[key].dtype for key in BASE_KEYS } ) )
+
+    # Distinct restaurants can't be summed across groups, so they come from the (much narrower) restaurant keys.
+    restaurants = engine.distinct( df.loc[ : , RESTAURANT_KEYS[:-1] ].assign( excellent=df["aggregate_rating"] >= EXCELLENT_RATING ),
+                                   RESTAURANT_KEYS )
+
+    return { "base": base,
+             "restaurants": restaurants,
+             "city_countries": df.loc[ : , ["city", "country"] ].drop_duplicates() }
+
+
+
+def _measures(base):
+    # base with MEASURE_DTYPES and its float sums rounded to SUM_DECIMALS. Flag keys are cast back to int8,
+    # which older pandas widen when they come back out of a groupby index.
+    base = base.astype( { **MEASURE_DTYPES, **{ key: "int8" for key in BASE_KEYS if key in INT8_COLUMNS } } )
+    base[ ["rating_sum", "cost_sum"] ] = base[ ["rating_sum", "cost_sum"] ].round(SUM_DECIMALS)
+    return base
+
+
+
+def merge_partials(first, second):
+    # Partial aggregates of two frames combined, as if cube_partial had run over both at once.
+    base = _measures( pd.concat( [first["base"], second["base"]], ignore_index=True )
+                        .groupby( BASE_KEYS, observed=True )[ MEASURES ].sum()
+                        .reset_index() )
+
+    return { "base": base,
+             "restaurants": pd.concat( [first["restaurants"], second["restaurants"]], ignore_index=True ).drop_duplicates(),
+             "city_countries": pd.concat( [first["city_countries"], second["city_countries"]], ignore_index=True ).drop_duplicates() }
+
+
+
+def _rollup(base, by):
+    # Additive measures of base summed up to the `by` level, with the means derived from them.
+    rolled = base.groupby( by, observed=True )[ MEASURES ].sum()
+
+    rolled["votes_mean"] = rolled["votes"] / rolled["rows"]
+    rolled["rating_mean"] = rolled["rating_sum"] / rolled["rows"]
+    rolled["cost_mean"] = rolled["cost_sum"] / rolled["rows"]
+
+    return rolled
+
+
+
+def _distinct(frame, by, col):
+    # Number of distinct values of col for each value of by (groupby(by)[col].nunique()).
+    return frame.drop_duplicates( [by, col] ).groupby( by, observed=True ).size()
+
+
+
+def restaurant_counts(restaurants):
+    # Distinct restaurants per country, city and cuisine (overall, excellent and with online delivery).
+    excellent = restaurants.loc[ restaurants["excellent"], : ]
+    online = restaurants.loc[ restaurants["has_online_delivery"] == 1, : ]
+
+    return { "countries": _distinct(restaurants, "country", "restaurant_id"),
+             "cities": _distinct(restaurants, "city", "restaurant_id"),
+             "excellent_cities": _distinct(excellent, "city", "restaurant_id"),
+             "cuisines": _distinct(restaurants, "cuisines", "restaurant_id"),
+             "online_cuisines": _distinct(online, "cuisines", "restaurant_id"),
+             "total": restaurants["restaurant_id"].nunique() }
+
+
+
+def _on(index, counts):
+    # counts (a Series over one dimension) for every value of index, 0 for those without any. Matched by value:
+    # reindexing fails when counts is empty and its categorical index has narrower codes than index's.
+    return index.astype(object).map(counts).fillna(0).astype(counts.dtype)
+
+
+
+def _tables(base, counts, city_countries, cuisine_base=None):
+    # Counts, distinct counts, sums and means used by the pages, from base and the distinct restaurant counts.
+    # Every table is indexed by its dimension, sorted the same way a groupby over df would be.
+    # Cuisine tables and counts come from cuisine_base when given (see multi_cuisine_cube).
+    cuisine_base = base if cuisine_base is None else cuisine_base
+
+    countries = _rollup(base, "country")
+    countries["restaurants"] = counts["countries"]
+    countries["cities"] = _distinct(base, "country", "city")
+    countries["cuisines"] = _distinct(cuisine_base, "country", "cuisines")
+
+    cities = _rollup(base, "city")
+    cities["restaurants"] = counts["cities"]
+    cities["cuisines"] = _distinct(cuisine_base, "city", "cuisines")
+    cities["excellent_restaurants"] = _on( cities.index, counts["excellent_cities"] )
+
+    cuisines = _rollup(cuisine_base, "cuisines")
+    cuisines["restaurants"] = counts["cuisines"]
+    cuisines["online_restaurants"] = _on( cuisines.index, counts["online_cuisines"] )
+
+    totals = { "countries": len(countries), "cities": len(cities), "cuisines": len(cuisines),
+               "restaurants": counts["total"], "votes": base["votes"].sum(),
+               "rating_mean": base["rating_sum"].sum() / base["rows"].sum() }
+
+    return { "base": base,
+             "countries": countries,
+             "cities": cities,
+             "cuisines": cuisines,
+             "country_cuisines": _rollup(cuisine_base, ["country", "cuisines"]),
+             "online_delivery": _rollup(base, "has_online_delivery"),
+             "table_booking": _rollup(base, "has_table_booking"),
+             # (city, country) pairs in order of first appearance, as df[["city", "country"]].drop_duplicates().
+             "city_countries": city_countries.reset_index(drop=True),
+             "totals": totals }
+
+
+
+def finish_cube(partial):
+    # The tables of the pages, from the partial aggregates of the whole dataset.
+    return _tables( partial["base"], restaurant_counts(partial["restaurants"]), partial["city_countries"] )
+
+
+
+def build_cube(df):
+    # The cube of an in-memory frame.
+    if MULTI_CUISINE:
+        return multi_cuisine_cube(df)
+
+    return finish_cube( cube_partial(df) )
+
+
+
+def multi_cuisine_cube(df):
+    # The cube with every restaurant counted under each cuisine of its full list (country, city and overall
+    # tables are the same as build_cube's). The cuisine sums and distinct counts come straight from the sparse
+    # CuisineIndex, one entry per restaurant and cuisine, so the frame is never exploded into a row per cuisine.
+    index = CuisineIndex(df)
+    partial = cube_partial(df)
+    keys = [ col for col in BASE_KEYS if col != "cuisines" ]
+
+    # Base at the BASE_KEYS grain, with each group of the other keys split by cuisine through the index.
+    groups = df.groupby( keys, observed=True, sort=False ).ngroup().to_numpy()
+    group_rows = np.zeros( groups.max() + 1 if len(groups) else 0, dtype=np.int64 )
+    group_rows[ groups ] = np.arange( len(groups) )
+
+    group_codes, cuisine_codes, sums = index.sums( groups, { "rows": np.ones( len(df) ),
+                                                             "votes": df["votes"],
+                                                             "rating_sum": df["aggregate_rating"],
+                                                             "cost_sum": df["dollar_average_cost_for_two"],
+                                                             "delivering_rows": df["is_delivering_now"] } )
+
+    cuisine_base = df.loc[ : , keys ].take( group_rows[ group_codes ] ).reset_index(drop=True)
+    cuisine_base.insert( BASE_KEYS.index("cuisines"), "cuisines", index.categorical(cuisine_codes) )
+    for name in MEASURES:
+        cuisine_base[name] = sums[name].round() if MEASURE_DTYPES[name] == "int64" else sums[name]
+    cuisine_base = _measures(cuisine_base)
+
+    counts = restaurant_counts( partial["restaurants"] )
+    restaurant_codes = pd.factorize( df["restaurant_id"] )[0]
+    counts["cuisines"] = index.distinct(restaurant_codes)
+    counts["online_cuisines"] = index.distinct( restaurant_codes, df["has_online_delivery"].to_numpy() == 1 )
+
+    return _tables( partial["base"], counts, partial["city_countries"], cuisine_base )
+
+
+
+def stream_cube(path=CSV_PATH, chunksize=DEFAULT_CHUNKSIZE):
+    # The cube of a CSV too large to load, fed batch by batch: memory holds one batch plus the partial aggregates.
+    return finish_cube( fold_batches(cube_partial, merge_partials, path, chunksize) )
+
+
+
+def update_cube(cube, df, removed=None):
+    # The cube with the rows of df added and those of removed taken out, where removed holds every row the cube
+    # counted for the restaurants it updates and none of df's other restaurants is in the cube yet.
+    # Sums are added into base (removed ones negated) and rolled up again, work that grows with the number of
+    # groups, not of rows. Distinct restaurant counts are incremented and decremented, which is exact because
+    # a restaurant counts once in every group it has a row in: taking all its rows out takes exactly that out.
+    partial = cube_partial(df)
+    parts = [ cube["base"], partial["base"] ]
+    gone = None
+    if removed is not None and len(removed):
+        gone = cube_partial(removed)
+        parts.append( gone["base"].assign( **{ measure: -gone["base"][measure] for measure in MEASURES } ) )
+
+    base = _measures( pd.concat( union_categories(parts), ignore_index=True )
+                        .groupby( BASE_KEYS, observed=True )[ MEASURES ].sum()
+                        .reset_index() )
+    base = base.loc[ base["rows"] > 0 ].reset_index(drop=True)
+
+    stored = { "countries": cube["countries"]["restaurants"],
+               "cities": cube["cities"]["restaurants"],
+               "excellent_cities": cube["cities"]["excellent_restaurants"],
+               "cuisines": cube["cuisines"]["restaurants"],
+               "online_cuisines": cube["cuisines"]["online_restaurants"],
+               "total": cube["totals"]["restaurants"] }
+
+    added = restaurant_counts(partial["restaurants"])
+    taken = restaurant_counts(gone["restaurants"]) if gone is not None else None
+    counts = {}
+    for name in stored:
+        if name == "total":
+            counts[name] = stored[name] + added[name] - (taken[name] if taken is not None else 0)
+            continue
+        terms = [ stored[name], added[name] ] + ( [ -taken[name] ] if taken is not None else [] )
+        summed = pd.concat(terms).groupby(level=0, observed=True).sum()
+        counts[name] = summed.loc[ summed != 0 ]
+
+    city_countries = pd.concat( union_categories( [cube["city_countries"], partial["city_countries"]] ), ignore_index=True ).drop_duplicates()
+    if gone is not None:
+        # Pairs left without a row (a restaurant updated into another city was its last one) are dropped.
+        pairs = pd.MultiIndex.from_frame( base[["city", "country"]].astype(str) )
+        city_countries = city_countries.loc[ pd.MultiIndex.from_frame( city_countries[["city", "country"]].astype(str) ).isin(pairs) ]
+
+    return _tables(base, counts, city_countries)
+
+
+
+def load_cube(path=CSV_PATH):
+    # The cube of the dataset, built once per version of the CSV and shared like the cleaned frame.
+    # Streamed from the CSV in batches when ZOMATO_CHUNKSIZE is set (except in multi-cuisine mode), otherwise
+    # built from load_data.
+    if STREAMED:
+        return cached("cube", lambda: stream_cube(path, CHUNKSIZE), path)
+
+    return load_derived("cube", build_cube, path)
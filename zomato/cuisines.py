@@ -0,0 +1,71 @@
+# IMPORTS
+import numpy as np
+import pandas as pd
+
+
+# Separator of the cuisines listed for a restaurant ("North Indian, Chinese, Mughlai").
+SEPARATOR = ","
+
+
+
+# CUISINE INDEX
+# ==============================================================================================================================================
+
+class CuisineIndex:
+    # Sparse restaurant x cuisine indicator matrix of the cleaned frame's full cuisine lists (cuisine_list), in
+    # compressed sparse row form: the cuisines of row i are cuisines[ indices[ indptr[i] : indptr[i + 1] ] ].
+    # Every distinct list is parsed once and expanded through the rows' category codes, so building it never
+    # splits a string per row, and aggregations work on integer codes rather than a frame exploded by cuisine.
+    def __init__(self, df):
+        lists = df["cuisine_list"].astype("category")
+        parsed = [ list( dict.fromkeys( c.strip() for c in text.split(SEPARATOR) if c.strip() ) ) for text in lists.cat.categories ]
+
+        self.cuisines = pd.Index( sorted( set().union(*parsed) ), dtype=object )
+        lengths = np.array( [ len(cuisines) for cuisines in parsed ], dtype=np.int64 )
+        flat = self.cuisines.get_indexer( [ c for cuisines in parsed for c in cuisines ] )
+        starts = np.cumsum(lengths) - lengths
+
+        codes = lists.cat.codes.to_numpy()
+        counts = lengths[codes]
+        self.indptr = np.concatenate( [ [0], np.cumsum(counts) ] )
+
+        # Row of every entry (the matrix in coordinate form), and the entry's position in its row's list.
+        self.rows = np.repeat( np.arange(len(codes)), counts )
+        offsets = np.arange( len(self.rows) ) - self.indptr[ self.rows ]
+        self.indices = flat[ starts[codes][ self.rows ] + offsets ].astype(np.int32)
+
+
+    def __len__(self):
+        # Number of (row, cuisine) entries.
+        return len(self.indices)
+
+
+    def categorical(self, codes):
+        # Cuisine codes as an ordered categorical, like the cleaned frame's cuisines column.
+        return pd.Categorical.from_codes( codes, categories=self.cuisines, ordered=True )
+
+
+    def sums(self, keys, values):
+        # Sums of values ({name: one number per row}) for every (key, cuisine) pair that occurs, where keys holds
+        # one non-negative integer per row (a group number). Returns the pairs' keys, their cuisine codes and
+        # {name: sums}.
+        n = len(self.cuisines)
+        pairs, inverse = np.unique( np.asarray(keys, dtype=np.int64)[ self.rows ] * n + self.indices, return_inverse=True )
+
+        sums = { name: np.bincount( inverse.ravel(), weights=np.asarray(value, dtype=np.float64)[ self.rows ], minlength=len(pairs) )
+                 for name, value in values.items() }
+
+        return pairs // n, pairs % n, sums
+
+
+    def distinct(self, keys, mask=None):
+        # Number of distinct keys (e.g. restaurant codes, one per row) listing each cuisine, counting only the rows
+        # where mask is true. Indexed by cuisine, without the cuisines that have none.
+        entries = slice(None) if mask is None else np.asarray(mask)[ self.rows ]
+        n = len(self.cuisines)
+
+        pairs = np.unique( np.asarray(keys, dtype=np.int64)[ self.rows[entries] ] * n + self.indices[entries] )
+        counts = np.bincount( pairs % n, minlength=n )
+
+        observed = np.flatnonzero(counts)
+        return pd.Series( counts[observed], index=pd.CategoricalIndex( self.categorical(observed), name="cuisines" ) )
@@ -0,0 +1,475 @@
+# IMPORTS
+import functools
+import hashlib
+import inspect
+import json
+import logging
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+from zomato.lazy import LazyModule
+from zomato.profiling import stage
+from zomato.schema import apply_schema, memory_report
+from zomato.snapshot import snapshot_path, read_snapshot, write_snapshot
+
+
+logger = logging.getLogger(__name__)
+
+# Only the CSV's column names need it, and the snapshot skips that step.
+inflection = LazyModule("inflection")
+
+
+# Default dataset, relative to the app root (where `streamlit run Home.py` is launched).
+CSV_PATH = 'zomato.csv'
+
+# Dollar value of every currency: {"version": ..., "rates": {currency: dollars}}, edited without touching the code.
+RATES_PATH = os.environ.get("ZOMATO_RATES", "currency_rates.json")
+
+
+
+# CLEANING RULES
+# ==============================================================================================================================================
+
+# Defining countries codes by their names.
+COUNTRIES = {
+            1: "India",
+            14: "Australia",
+            30: "Brazil",
+            37: "Canada",
+            94: "Indonesia",
+            148: "New Zeland",
+            162: "Philippines",
+            166: "Qatar",
+            184: "Singapure",
+            189: "South Africa",
+            191: "Sri Lanka",
+            208: "Turkey",
+            214: "United Arab Emirates",
+            215: "England",
+            216: "United States of America",
+            }
+
+
+# Defining price ranges with a more intuitive description (anything else is "gourmet").
+PRICE_TYPES = {
+            1: "cheap",
+            2: "normal",
+            3: "expensive",
+            }
+
+
+# Transforming the hex code to color name.
+COLORS = {
+        "3F7E00": "darkgreen",
+        "5BA829": "green",
+        "9ACD32": "lightgreen",
+        "CDD614": "lemon",
+        "FFBA00": "yellow",
+        "CBCBC8": "gray",
+        "FF7800": "orange",
+        }
+
+
+# Translating the rating text.
+RATING_TEXT = {
+                "darkgreen": "Excellent",
+                "green": "Very Good",
+                "lightgreen": "Good",
+                "lemon": "Average",
+                "yellow": "Average",
+                "gray": "Not rated",
+                "orange": "Poor",
+                }
+
+
+# Delete absurd values (over $ 1.000 for two).
+MAX_DOLLAR_COST_FOR_TWO = 1000
+
+
+# What to do with rows that share a Restaurant ID but differ elsewhere (see deduplicate).
+DEDUP_POLICIES = ( "latest", "max_votes", "flag" )
+DEDUP_POLICY = os.environ.get("ZOMATO_DEDUP", "latest")
+
+
+
+
+# DATA CLEANING
+# ==============================================================================================================================================
+
+def rename_columns(dataframe):
+    # Rename the columns to something_like_this (in place, no copy of the data).
+    title = lambda x: inflection.titleize(x)
+    snakecase = lambda x: inflection.underscore(x)
+    spaces = lambda x: x.replace(" ", "")
+
+    cols_old = list(dataframe.columns)
+    cols_old = list(map(title, cols_old))
+    cols_old = list(map(spaces, cols_old))
+    cols_new = list(map(snakecase, cols_old))
+
+    dataframe.columns = cols_new
+    return dataframe
+
+
+
+def deduplicate(df, policy=DEDUP_POLICY):
+    # Rows of the raw frame deduplicated by Restaurant ID; returns the frame and counts of what was found.
+    # Repeated IDs are found with an integer hash table, and only their rows are hashed in full (64 bits per
+    # row) instead of comparing every wide text row: exact copies are dropped (the first is kept), and IDs
+    # whose rows differ are conflicts, resolved by policy. "latest" keeps the ID's last row in the file,
+    # "max_votes" its most voted row (the latest among ties) and "flag" keeps them all, marked in id_conflict.
+    # Conflicts are resolved over all the ID's rows, copies included, so a copy later in the file counts as latest.
+    if policy not in DEDUP_POLICIES:
+        raise ValueError(f"Unknown dedup policy {policy!r}, expected one of {DEDUP_POLICIES}")
+
+    ids = df["Restaurant ID"]
+    repeated = ids.duplicated(keep=False).to_numpy()
+    report = { "duplicates": 0, "conflicts": 0, "conflict_rows": 0 }
+
+    rows = pd.DataFrame( { "id": ids[repeated], "hash": pd.util.hash_pandas_object( df.loc[ repeated, : ], index=False ) } )
+    copies = rows.duplicated()
+    distinct = rows.loc[ ~copies, : ]
+    conflicts = distinct.loc[ distinct["id"].duplicated(keep=False), : ]
+
+    report.update( duplicates=int(copies.sum()), conflicts=conflicts["id"].nunique(), conflict_rows=len(conflicts) )
+
+    if policy == "flag":
+        drop = copies.index[ copies.to_numpy() ]
+
+    else:
+        # Copies of IDs without conflicts are dropped as such; the conflicting IDs' rows (copies too) go to the policy.
+        contested = rows.loc[ rows["id"].isin(conflicts["id"]), : ]
+        drop = copies.index[ copies.to_numpy() & ~rows["id"].isin(conflicts["id"]).to_numpy() ]
+
+        if policy == "latest":
+            drop = drop.union( contested.index[ contested["id"].duplicated(keep="last") ] )
+
+        else:
+            # idxmax keeps the first of ties, so the rows are scanned from the end of the file.
+            kept = df.loc[ contested.index[::-1], "Votes" ].groupby( contested["id"][::-1], sort=False ).idxmax()
+            drop = drop.union( contested.index.difference(kept) )
+
+    df = df.drop(index=drop)
+
+    if policy == "flag":
+        df = df.assign( id_conflict=df.index.isin(conflicts.index) )
+
+    return df, report
+
+
+
+def clean_base(df, report=None):
+    # Every cleaning step that doesn't depend on the currency rates (see convert_currency for the others).
+    # Every step works on whole columns at once: one NaN mask, dict lookups via .map and vectorized string ops.
+    # Dedup counts (see deduplicate) are added to report when a dict is given.
+
+    # Deleting rows with NaN values (a single mask over all columns).
+    df = df.loc[ df.notna().all(axis=1) , : ]
+
+
+    # Dropping duplicates: one row per restaurant, conflicting rows resolved by DEDUP_POLICY.
+    df, dedup = deduplicate(df)
+    if report is not None:
+        report.update(dedup)
+
+
+    # Making new columns to better describe the informations we have.
+    df = rename_columns(df.copy())
+
+    df["country"] = df["country_code"].map(COUNTRIES)
+
+    df["price_type"] = df["price_range"].map(PRICE_TYPES).fillna("gourmet")
+
+    df["rating_color"] = df["rating_color"].map(COLORS)
+
+    df["rating_text"] = df["rating_color"].map(RATING_TEXT)
+
+
+    # Also use only one type of cuisine for the restaurants (the full list is kept for the multi-cuisine mode, see zomato.cuisines).
+    df["cuisine_list"] = df["cuisines"]
+    df["cuisines"] = df["cuisines"].str.replace(r"(?s),.*", "", regex=True)
+
+
+    # Reset index after cleaning everything.
+    return df.reset_index(drop=True)
+
+
+
+def convert_currency(df, rates):
+    # Convert every currency to Dollar (rates: dollars per unit, indexed by currency) and delete absurd values.
+    # The rates are joined on the currency's category codes, one lookup per currency instead of one per row;
+    # currencies without a rate get no dollar cost and are dropped with the absurd values. Unused categories
+    # are dropped too, so the result is what apply_schema gives for the same rows.
+    currency = df["currency"].astype("category")
+    factors = rates.reindex( currency.cat.categories ).to_numpy(dtype="float64")
+
+    if np.isnan(factors).any():
+        logger.warning("No currency rate for %s (rates version %s); their restaurants are dropped",
+                       list( currency.cat.categories[ np.isnan(factors) ] ), rates.name)
+
+    # Code -1 (a missing currency) picks the NaN appended at the end.
+    codes = currency.cat.codes.to_numpy()
+    dollars = np.append(factors, np.nan)[codes] * df["average_cost_for_two"].to_numpy(dtype="float64")
+    keep = dollars < MAX_DOLLAR_COST_FOR_TWO
+
+    df = df.assign( dollar_average_cost_for_two=dollars )
+    if keep.all():
+        return df
+
+    df = df.loc[ keep, : ].reset_index(drop=True)
+    categorical = [ col for col in df.columns if isinstance(df[col].dtype, pd.CategoricalDtype) ]
+
+    return df.assign( **{ col: df[col].cat.remove_unused_categories() for col in categorical } )
+
+
+
+def clean_code(df, report=None, rates=None):
+    # The whole cleaning of a raw frame, with the current rates (see load_rates) unless others are given.
+    return convert_currency( clean_base(df, report), load_rates() if rates is None else rates )
+
+
+
+
+# DATA LOADING
+# ==============================================================================================================================================
+
+# Cleaned frames (and what is derived from them) shared by every session of this process, keyed by
+# (path, mtime, size, hash, rates hash): see data_key. Frames cleaned up to the currency conversion (see
+# clean_base) are kept apart, keyed by the CSV alone, so a change of rates reuses them.
+_cache = {}
+_bases = {}
+_rates = {}
+_hashes = {}
+_hashers = {}
+_lock = threading.RLock()
+
+# Builds in progress ((id of the dict the value goes in, its key) -> Event set when the build ends), see build_once.
+_building = {}
+
+
+def file_fingerprint(path):
+    # Identify a file by its absolute path, mtime, size and content hash.
+    # The hash is only recomputed when the mtime or size changes.
+    path = os.path.abspath(path)
+    stat = os.stat(path)
+    key = (path, stat.st_mtime_ns, stat.st_size)
+
+    if key not in _hashes:
+        sha = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                sha.update(block)
+
+        _hashes[key] = sha.hexdigest()
+        # Kept so rows appended later (append_rows) are hashed without reading the whole file again.
+        _hashers[path] = (key, sha)
+
+    return key + (_hashes[key],)
+
+
+
+def load_rates(path=RATES_PATH):
+    # Dollar value of one unit of every currency, indexed by currency and named after the rates file's version.
+    # Read once per version of the file.
+    with _lock:
+        key = file_fingerprint(path)
+
+        if key not in _rates:
+            with open(key[0], encoding='utf-8') as f:
+                table = json.load(f)
+
+            _rates.clear()
+            _rates[key] = pd.Series( table["rates"], dtype="float64", name=str(table["version"]) )
+            logger.info("Currency rates version %s from %s", table["version"], path)
+
+        return _rates[key]
+
+
+
+def data_key(path=CSV_PATH):
+    # Version of the cleaned frame of path: the CSV's fingerprint and the hash of the rates file.
+    return file_fingerprint(path) + ( file_fingerprint(RATES_PATH)[3], )
+
+
+
+@functools.lru_cache(maxsize=None)
+def cleaning_version():
+    # Hash of the cleaning rules and code, so snapshots are rebuilt whenever either changes.
+    # The rates aren't part of it: they are a file of their own (see data_key), applied after the snapshot.
+    rules = [COUNTRIES, PRICE_TYPES, COLORS, RATING_TEXT, MAX_DOLLAR_COST_FOR_TWO, DEDUP_POLICY]
+    source = ( inspect.getsource(rename_columns) + inspect.getsource(deduplicate) + inspect.getsource(clean_base)
+               + inspect.getsource(convert_currency) + inspect.getsource(apply_schema) + repr(rules) )
+
+    return hashlib.sha256(source.encode()).hexdigest()[:16]
+
+
+
+def snapshot_metadata(fingerprint):
+    # What a snapshot of the cleaned frame is tagged with: the CSV version and the cleaning code it came from.
+    _, _, size, sha = fingerprint
+    return {'source_size': size, 'source_sha256': sha, 'cleaning_version': cleaning_version()}
+
+
+
+def load_clean(path, fingerprint):
+    # Load the frame cleaned up to the currency conversion (see clean_base) from its parquet snapshot,
+    # rebuilding it from the CSV when the snapshot is stale.
+    metadata = snapshot_metadata(fingerprint)
+
+    snapshot = snapshot_path(path)
+    with stage("read_snapshot", "load"):
+        df = read_snapshot(snapshot, metadata)
+
+    if df is None:
+        with stage("read_csv", "load"):
+            raw = pd.read_csv(path)
+        dedup = {}
+        with stage("clean_base") as timing:
+            cleaned = clean_base(raw, dedup)
+            timing.note(**dedup)
+        with stage("apply_schema"):
+            df = apply_schema(cleaned)
+
+        report = memory_report(cleaned, df)
+        logger.info("Cleaned %s: %d rows, %.1f MB -> %.1f MB after apply_schema", path, len(df),
+                    report.loc["total", "bytes_before"] / 1e6, report.loc["total", "bytes_after"] / 1e6)
+        logger.info("Deduplicated %s by restaurant ID (%s): %d duplicates, %d conflicting IDs in %d rows", path, DEDUP_POLICY,
+                    dedup["duplicates"], dedup["conflicts"], dedup["conflict_rows"])
+
+        with stage("write_snapshot", "load"):
+            write_snapshot(df, snapshot, metadata)
+
+    return df
+
+
+
+def build_once(store, slot, build, lock=_lock):
+    # store[slot], built by build() when missing. The build runs outside lock (the one guarding store), so a long
+    # one (cleaning the CSV, streaming the cube) doesn't hold up the sessions using what is already cached; threads
+    # asking for the same slot meanwhile wait for it instead of building it again, and retry if it fails.
+    while True:
+        with lock:
+            if slot in store:
+                return store[slot]
+
+            building = _building.get( (id(store), slot) )
+            if building is None:
+                building = _building[ (id(store), slot) ] = threading.Event()
+                break
+
+        building.wait()
+
+    try:
+        value = build()
+        with lock:
+            store[slot] = value
+        return value
+
+    finally:
+        with lock:
+            del _building[ (id(store), slot) ]
+        building.set()
+
+
+
+def cached(name, build, path=CSV_PATH):
+    # Cache build() under name for the current version of path and of the rates; it is rebuilt only when
+    # either file changes.
+    with _lock:
+        key = data_key(path)
+
+        if key not in _cache:
+            # Drop stale versions of the same file before caching the new one.
+            for old_key in [k for k in _cache if k[0] == key[0]]:
+                del _cache[old_key]
+
+            _cache[key] = {}
+
+        entry = _cache[key]
+
+    with stage(name, "load", cached=name in entry):
+        return build_once(entry, name, build)
+
+
+
+def load_base(path=CSV_PATH):
+    # The dataset cleaned up to the currency conversion, read once per version of the CSV (whatever the rates).
+    with _lock:
+        key = file_fingerprint(path)
+
+        if key not in _bases:
+            for old_key in [k for k in _bases if k[0] == key[0]]:
+                del _bases[old_key]
+
+    with stage("base", "load", cached=key in _bases):
+        return build_once( _bases, key, lambda: load_clean(path, key) )
+
+
+
+def load_data(path=CSV_PATH):
+    # Read and clean the dataset once per process; later calls (any page, any session) reuse it.
+    # When only the rates change, just the conversion runs again, on the frame of load_base.
+    # The returned frame is shared, so callers must not modify it in place.
+    def build():
+        base, rates = load_base(path), load_rates()
+        with stage("convert_currency", rates=rates.name):
+            return convert_currency(base, rates)
+
+    return cached('df', build, path)
+
+
+
+def load_derived(name, build, path=CSV_PATH):
+    # Cache build(df) next to the cleaned frame it was computed from.
+    return cached(name, lambda: build(load_data(path)), path)
+
+
+
+def append_rows(raw, path=CSV_PATH):
+    # Append raw rows (with the CSV's columns) to the CSV and return the file's new fingerprint.
+    # When this process already hashed the file, only the appended bytes are read to update its hash.
+    with _lock:
+        old = file_fingerprint(path)
+        columns = pd.read_csv(path, nrows=0).columns
+
+        with open(path, 'rb') as f:
+            f.seek(max(old[2] - 1, 0))
+            needs_newline = old[2] > 0 and f.read(1) != b'\n'
+
+        with open(path, 'a', encoding='utf-8', newline='') as f:
+            if needs_newline:
+                f.write('\n')
+            raw.loc[ : , columns ].to_csv(f, header=False, index=False)
+
+        stat = os.stat(old[0])
+        key = (old[0], stat.st_mtime_ns, stat.st_size)
+        previous = _hashers.get(old[0])
+
+        if previous is not None and previous[0] == old[:3]:
+            sha = previous[1].copy()
+            with open(old[0], 'rb') as f:
+                f.seek(old[2])
+                for block in iter(lambda: f.read(1 << 20), b''):
+                    sha.update(block)
+
+            _hashes[key] = sha.hexdigest()
+            _hashers[old[0]] = (key, sha)
+
+        return file_fingerprint(path)
+
+
+
+def replace_cached(old_key, new_key, base, values):
+    # Move the cache of one version of a file (fingerprints old_key and new_key) to its next version, with the
+    # frame of load_base and values ({name: value}, for the current rates) already brought up to date.
+    # Anything else derived from the old version is dropped and rebuilt when next used.
+    with _lock:
+        _bases.pop(old_key, None)
+        _bases[new_key] = base
+
+        for key in [k for k in _cache if k[:4] == old_key]:
+            del _cache[key]
+        _cache[ data_key(new_key[0]) ] = dict(values)
@@ -0,0 +1,140 @@
+# Query engines for the grouped aggregations behind the cube (see zomato.cube).
+#
+#   ZOMATO_ENGINE=duckdb streamlit run Home.py
+#
+# "pandas" runs them with groupby, on one core. "duckdb" runs the same queries in DuckDB's multithreaded
+# columnar engine, reading the frame's columns in place; "auto" (the default) picks DuckDB when it is installed
+# (pip install duckdb) and falls back to pandas otherwise. Both return the same frames: keys sorted the way
+# pandas sorts them, categoricals restored and the dtypes chosen by the caller.
+
+# IMPORTS
+import importlib.util
+import logging
+import os
+import threading
+
+import pandas as pd
+
+from zomato.lazy import LazyModule
+
+# An optional accelerator (pandas does the same work without it), imported when the first query runs.
+duckdb = LazyModule("duckdb") if importlib.util.find_spec("duckdb") is not None else None
+
+
+logger = logging.getLogger(__name__)
+
+ENGINES = ( "auto", "pandas", "duckdb" )
+ENGINE = os.environ.get("ZOMATO_ENGINE", "auto")
+
+
+
+# ENGINES
+# ==============================================================================================================================================
+
+class PandasEngine:
+    name = "pandas"
+
+
+    def group_sums(self, df, keys, aggregations):
+        # One row per observed combination of keys, sorted by them, with aggregations ({name: (column, "sum" or
+        # "size")}) as columns.
+        return df.groupby( keys, observed=True ).agg( **aggregations ).reset_index()
+
+
+    def distinct(self, df, columns):
+        # Distinct rows of df's columns, in no particular order.
+        return df.loc[ : , columns ].drop_duplicates().reset_index(drop=True)
+
+
+
+class DuckDBEngine:
+    name = "duckdb"
+
+
+    def __init__(self):
+        self.connection = duckdb.connect()
+        self.lock = threading.Lock()
+
+
+    def _query(self, sql, columns):
+        # Run sql over a table "frame" holding columns ({name: array}); every thread gets its own cursor.
+        frame = pd.DataFrame(columns, copy=False)
+
+        with self.lock:
+            cursor = self.connection.cursor()
+
+        try:
+            cursor.register("frame", frame)
+            return cursor.execute(sql).df()
+        finally:
+            cursor.close()
+
+
+    def _columns(self, df, columns):
+        # Categoricals are sent as their integer codes (so grouping and sorting follow the categories' order)
+        # and every other column as its numpy array, without copying.
+        return { col: df[col].cat.codes.to_numpy() if isinstance(df[col].dtype, pd.CategoricalDtype) else df[col].to_numpy()
+                 for col in columns }
+
+
+    def _restore(self, result, df):
+        # Codes back to df's categoricals.
+        for col in result.columns:
+            if col in df.columns and isinstance(df[col].dtype, pd.CategoricalDtype):
+                result[col] = pd.Categorical.from_codes( result[col].to_numpy(), dtype=df[col].dtype )
+
+        return result
+
+
+    def group_sums(self, df, keys, aggregations):
+        sources = list( dict.fromkeys( keys + [ col for col, _ in aggregations.values() ] ) )
+        columns = self._columns(df, sources)
+
+        selects = [ f'"{key}"' for key in keys ]
+        for name, (col, function) in aggregations.items():
+            selects.append( f'COUNT(*) AS "{name}"' if function == "size" else f'SUM("{col}") AS "{name}"' )
+
+        # Rows with a missing key (code -1 of a categorical, NULL otherwise) are left out, as groupby does.
+        where = [ f'"{key}" >= 0' if isinstance(df[key].dtype, pd.CategoricalDtype) else f'"{key}" IS NOT NULL' for key in keys ]
+        group = ", ".join( f'"{key}"' for key in keys )
+
+        sql = f"SELECT {', '.join(selects)} FROM frame WHERE {' AND '.join(where)} GROUP BY {group} ORDER BY {group}"
+        return self._restore( self._query(sql, columns), df )
+
+
+    def distinct(self, df, columns):
+        sql = "SELECT DISTINCT " + ", ".join( f'"{col}"' for col in columns ) + " FROM frame"
+        return self._restore( self._query( sql, self._columns(df, columns) ), df )
+
+
+
+# SELECTION
+# ==============================================================================================================================================
+
+_engines = {}
+_lock = threading.Lock()
+
+
+def available_engines():
+    # Names of the engines that can run here.
+    return [ "pandas" ] + ( [ "duckdb" ] if duckdb is not None else [] )
+
+
+
+
+def query_engine(name=ENGINE):
+    # The engine called name, created once per process; "auto" is DuckDB when installed, otherwise pandas.
+    # Asking for DuckDB without it installed falls back to pandas, with a warning.
+    if name not in ENGINES:
+        raise ValueError(f"Unknown query engine {name!r}, expected one of {ENGINES}")
+
+    resolved = "duckdb" if name != "pandas" and duckdb is not None else "pandas"
+
+    with _lock:
+        if resolved not in _engines:
+            if name == "duckdb" and duckdb is None:
+                logger.warning("ZOMATO_ENGINE=duckdb but duckdb isn't installed; using pandas")
+
+            _engines[resolved] = DuckDBEngine() if resolved == "duckdb" else PandasEngine()
+
+        return _engines[resolved]
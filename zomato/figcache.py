@@ -0,0 +1,207 @@
+# IMPORTS
+import collections
+import functools
+import hashlib
+import importlib.util
+import inspect
+import json
+import os
+import threading
+
+from zomato.lazy import LazyModule
+from zomato.profiling import stage
+
+
+# Only needed once a figure is cached or read back.
+go = LazyModule("plotly.graph_objects")
+pio = LazyModule("plotly.io")
+
+
+# Where serialized figures are kept between runs (and processes). Set ZOMATO_FIGURE_CACHE to an empty
+# string to keep them in memory only.
+FIGURE_CACHE_DIR = os.environ.get("ZOMATO_FIGURE_CACHE", ".figure_cache")
+
+# Bounds of the two LRU tiers.
+MEMORY_ENTRIES = 256
+MEMORY_BYTES = 64 * 2**20
+DISK_BYTES = 256 * 2**20
+
+# Modules the cube the page functions read is built with: a change in any of them changes every figure.
+CUBE_MODULES = ( "zomato.cube", "zomato.cuisines", "zomato.engine", "zomato.helpers", "zomato.ingest", "zomato.schema" )
+
+
+
+# FIGURE CACHE
+# ==============================================================================================================================================
+
+_sources = {}
+
+
+def code_version(function):
+    # Hash of the function's source, so cached figures are dropped whenever the function changes.
+    if function not in _sources:
+        _sources[function] = hashlib.sha256( inspect.getsource(function).encode() ).hexdigest()[:16]
+
+    return _sources[function]
+
+
+
+@functools.lru_cache(maxsize=None)
+def modules_version(*names):
+    # Hash of the source files of the modules names, found without importing them (read once per process).
+    sha = hashlib.sha256()
+
+    for name in names:
+        with open(importlib.util.find_spec(name).origin, 'rb') as f:
+            sha.update( f.read() )
+
+    return sha.hexdigest()[:16]
+
+
+
+def figure_key(function, version, params):
+    # Cache key of function's figure for one version of the dataset and one set of parameters, and for the code
+    # of the function and of the cube it reads.
+    key = json.dumps( [ version, function.__module__, function.__name__, code_version(function), modules_version(*CUBE_MODULES), params ],
+                      sort_keys=True, default=repr )
+    return hashlib.sha256(key.encode()).hexdigest()
+
+
+
+class FigureCache:
+    # Figures by key, in two least-recently-used tiers: Figure objects in memory (bounded by entries and by the
+    # size of their JSON) and their JSON on disk (bounded by bytes). Tables are kept in the memory tier only.
+    # Results handed out are shared by every session, so they must not be modified; layout changes belong
+    # in the cache key.
+    def __init__(self, directory=FIGURE_CACHE_DIR, memory_entries=MEMORY_ENTRIES, memory_bytes=MEMORY_BYTES, disk_bytes=DISK_BYTES):
+        self.directory = directory
+        self.memory_entries, self.memory_bytes, self.disk_bytes = memory_entries, memory_bytes, disk_bytes
+        self.memory = collections.OrderedDict()
+        self.memory_used = 0
+        self.disk = None
+        self.disk_used = 0
+        self.lock = threading.RLock()
+        self.hits = collections.Counter()
+
+
+    def _disk_index(self):
+        # {key: size} of the files on disk, least recently used first (read once, then kept up to date).
+        if self.disk is None:
+            self.disk = collections.OrderedDict()
+
+            if self.directory and os.path.isdir(self.directory):
+                entries = sorted( ( entry for entry in os.scandir(self.directory) if entry.name.endswith(".json") ),
+                                  key=lambda entry: entry.stat().st_mtime )
+                for entry in entries:
+                    self.disk[ entry.name[:-5] ] = entry.stat().st_size
+
+                self.disk_used = sum( self.disk.values() )
+
+        return self.disk
+
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + ".json")
+
+
+    def _remember(self, key, figure, size):
+        if key in self.memory:
+            self.memory_used -= self.memory.pop(key)[1]
+
+        self.memory[key] = (figure, size)
+        self.memory_used += size
+
+        while len(self.memory) > 1 and (len(self.memory) > self.memory_entries or self.memory_used > self.memory_bytes):
+            self.memory_used -= self.memory.popitem(last=False)[1][1]
+
+
+    def get(self, key):
+        # The cached figure, or None.
+        with self.lock:
+            if key in self.memory:
+                self.memory.move_to_end(key)
+                self.hits["memory"] += 1
+                return self.memory[key][0]
+
+            disk = self._disk_index()
+            if key not in disk:
+                self.hits["miss"] += 1
+                return None
+
+            try:
+                with open(self._path(key), encoding="utf-8") as f:
+                    text = f.read()
+                os.utime( self._path(key) )
+            except OSError:
+                self.disk_used -= disk.pop(key)
+                self.hits["miss"] += 1
+                return None
+
+            disk.move_to_end(key)
+            figure = pio.from_json(text)
+            self._remember(key, figure, len(text))
+            self.hits["disk"] += 1
+
+            return figure
+
+
+    def put(self, key, value):
+        # Cache a figure under key in both tiers, anything else (a table) in memory.
+        if not isinstance(value, go.Figure):
+            with self.lock:
+                self._remember( key, value, int( value.memory_usage(deep=True).sum() ) )
+            return
+
+        text = value.to_json()
+
+        with self.lock:
+            self._remember(key, value, len(text))
+
+            if not self.directory:
+                return
+
+            disk = self._disk_index()
+            try:
+                os.makedirs(self.directory, exist_ok=True)
+                tmp = self._path(key) + ".tmp"
+                with open(tmp, "w", encoding="utf-8") as f:
+                    f.write(text)
+                os.replace( tmp, self._path(key) )
+            except OSError:
+                return
+
+            self.disk_used += len(text) - disk.pop(key, 0)
+            disk[key] = len(text)
+
+            while len(disk) > 1 and self.disk_used > self.disk_bytes:
+                old, size = disk.popitem(last=False)
+                self.disk_used -= size
+                try:
+                    os.remove( self._path(old) )
+                except OSError:
+                    pass
+
+
+
+figures = FigureCache()
+
+
+
+def cached_result(function, cube, version, layout=None, **params):
+    # function(cube, **params), with layout applied to figures, reused from the cache when it was computed
+    # before for this version of the dataset.
+    key = figure_key( function, version, dict(params, layout=layout) )
+
+    with stage(function.__name__, "cache"):
+        cached = figures.get(key)
+
+    if cached is not None:
+        return cached
+
+    value = function(cube, **params)
+
+    if layout and isinstance(value, go.Figure):
+        value.update_layout(**layout)
+    figures.put(key, value)
+
+    return value
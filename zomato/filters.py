@@ -0,0 +1,171 @@
+# IMPORTS
+import collections
+import threading
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from zomato.artifacts import ARTIFACTS_DIR, data_version
+from zomato.cube import STREAMED, build_cube, load_cube
+from zomato.data import CSV_PATH, build_once, cached, load_data, load_derived
+from zomato.ingest import CHUNKSIZE
+
+
+# Columns the sidebar filters on (column -> label): several values can be picked in each.
+FILTER_COLUMNS = { "country": "Countries",
+                   "city": "Cities",
+                   "price_type": "Price types",
+                   "rating_text": "Ratings" }
+
+# 0/1 flags the sidebar filters on.
+FLAG_FILTERS = { "has_online_delivery": "Online delivery",
+                 "has_table_booking": "Table booking",
+                 "is_delivering_now": "Delivering now" }
+
+FLAG_CHOICES = { "Any": None, "Yes": 1, "No": 0 }
+
+# Filtered subsets kept (with what was computed from them), least recently used dropped first.
+SELECTIONS = 32
+
+
+
+# BITMAP INDEX
+# ==============================================================================================================================================
+
+class BitmapIndex:
+    # One packed bitmap (a bit per row) for every value of every filter column of the cleaned frame, so a
+    # combination of filters is a few ORs and ANDs over n / 8 bytes instead of scans of the frame.
+    def __init__(self, df):
+        self.rows = len(df)
+        self.bitmaps = {}
+
+        for col in list(FILTER_COLUMNS) + list(FLAG_FILTERS):
+            codes, values = pd.factorize( df[col], sort=True )
+            self.bitmaps[col] = { value: np.packbits(codes == i) for i, value in enumerate(values.tolist()) }
+
+
+    def mask(self, filters):
+        # Packed bitmap of the rows matching every filter ({column: [values]}): any of its values per column.
+        result = np.full( (self.rows + 7) // 8, 0xFF, dtype=np.uint8 )
+
+        for col, values in filters.items():
+            bitmaps = [ self.bitmaps[col][value] for value in values if value in self.bitmaps[col] ]
+            result &= np.bitwise_or.reduce(bitmaps) if bitmaps else 0
+
+        return result
+
+
+    def rows_of(self, filters):
+        # Positions of the rows matching the filters.
+        return np.flatnonzero( np.unpackbits( self.mask(filters), count=self.rows ) )
+
+
+    def values(self, col, within=None):
+        # Values of col, or only those found in the rows of the packed bitmap `within`.
+        return [ value for value, bitmap in self.bitmaps[col].items() if within is None or np.any(bitmap & within) ]
+
+
+
+# FILTERED DATA
+# ==============================================================================================================================================
+
+_selections = collections.OrderedDict()
+_lock = threading.RLock()
+
+
+def _selection(filters, path):
+    # The rows matching the filters, and a place for what is derived from them. Built outside _lock (see
+    # data.build_once), so one session's new selection doesn't hold up the others' reads.
+    key = data_version(filters, path)
+
+    def build():
+        rows = load_derived("bitmaps", BitmapIndex, path).rows_of(filters)
+        return { "df": load_data(path).take(rows).reset_index(drop=True) }
+
+    selection = build_once(_selections, key, build, _lock)
+
+    with _lock:
+        if key in _selections:
+            _selections.move_to_end(key)
+
+        while len(_selections) > SELECTIONS:
+            _selections.popitem(last=False)
+
+    return selection
+
+
+
+def filtered_frame(filters, path=CSV_PATH):
+    # Cleaned rows matching the filters (the whole frame when none is set).
+    return _selection(filters, path)["df"] if filters else load_data(path)
+
+
+
+def filtered_derived(name, build, filters, path=CSV_PATH, stream=None):
+    # build() of the rows matching the filters, computed once per version of the dataset and set of filters.
+    # When the data is streamed (see cube.STREAMED, filters are off then), stream(path, chunksize) builds it
+    # from the CSV's batches instead, if given.
+    if not filters and STREAMED and stream is not None:
+        return cached( name, lambda: stream(path, CHUNKSIZE), path )
+
+    if not filters:
+        return load_derived(name, build, path)
+
+    selection = _selection(filters, path)
+    return build_once( selection, name, lambda: build( selection["df"] ), _lock )
+
+
+
+def filtered_cube(filters, path=CSV_PATH):
+    # Aggregate cube of the rows matching the filters.
+    return filtered_derived("cube", build_cube, filters, path) if filters else load_cube(path)
+
+
+
+
+# SIDEBAR
+# ==============================================================================================================================================
+
+def sidebar_filters(path=CSV_PATH):
+    # Filter widgets in the sidebar; returns {column: [values]} of the filters that are set.
+    # Choices are kept in the session, so they follow the user from page to page.
+    if ARTIFACTS_DIR:
+        st.sidebar.caption("Filters are off: the pages are served from precomputed artifacts.")
+        return {}
+
+    if STREAMED:
+        # Filtering needs the whole frame (and its bitmaps), which streaming is there to avoid.
+        st.sidebar.caption("Filters are off: the data is streamed in batches (ZOMATO_CHUNKSIZE).")
+        return {}
+
+    index = load_derived("bitmaps", BitmapIndex, path)
+    state = st.session_state.setdefault("filters", {})
+    filters = {}
+
+    st.sidebar.markdown('## Filters')
+
+    for col, label in FILTER_COLUMNS.items():
+        # Cities are limited to the countries picked above them.
+        options = index.values( col, index.mask(filters) if col == "city" and filters else None )
+        chosen = st.sidebar.multiselect( label, options, default=[ v for v in state.get(col, []) if v in options ], key=f"filter_{col}" )
+
+        state[col] = chosen
+        if chosen:
+            filters[col] = chosen
+
+    for col, label in FLAG_FILTERS.items():
+        choices = list(FLAG_CHOICES)
+        chosen = st.sidebar.radio( label, choices, index=choices.index( state.get(col, "Any") ), horizontal=True, key=f"filter_{col}" )
+
+        state[col] = chosen
+        if FLAG_CHOICES[chosen] is not None:
+            filters[col] = [ FLAG_CHOICES[chosen] ]
+
+    st.sidebar.markdown("""---""")
+
+    if filters and filtered_frame(filters, path).empty:
+        st.warning('No restaurants match the selected filters.')
+        st.stop()
+
+    return filters
@@ -0,0 +1,290 @@
+# IMPORTS
+import pandas as pd
+
+from zomato.helpers import adjust_df
+from zomato.lazy import LazyModule
+from zomato.profiling import timed
+
+
+# Imported when the first chart is drawn (tables don't need plotly).
+go = LazyModule("plotly.graph_objects")
+
+
+# Tables and charts of the Geographic Overview page, computed from the aggregate cube (zomato.cube).
+# ==============================================================================================================================================
+
+# COUNTRIES ----------------------------------------
+
+@timed
+def countries_reg_cities_df(cube):
+    # Countries with most unique cities
+    df_cities_by_country = ( cube["countries"].loc[ : , ["cities", "restaurants"] ].sort_values("cities", ascending=False)
+                                                                                 .reset_index() )
+
+    countries_reg_cities_df = df_cities_by_country.loc[ :4 , ["country", "cities", "restaurants"] ]
+    countries_reg_cities_df.columns = [ "country", "city", "restaurant_amount" ]
+    
+    return adjust_df( countries_reg_cities_df )
+
+
+
+@timed
+def countries_cuisines_df(cube):
+    # Countries with most unique cuisines
+    df_cuisines_by_country = ( cube["countries"].loc[ : , ["cuisines"] ].sort_values("cuisines", ascending=False)
+                                                                        .reset_index() )
+
+    df_cuisines_by_country = df_cuisines_by_country.loc[ 0:4 , ["country", "cuisines"] ]
+
+    return adjust_df(df_cuisines_by_country)
+
+
+
+@timed
+def countries_ratings_per_restaurant_df(cube):
+    # Most ratings per restaurant
+
+    # Votes and unique restaurants by country, ordered by votes
+    df_rate_ratings_by_country = ( cube["countries"].loc[ : , ["votes", "restaurants"] ].sort_values("votes", ascending=False)
+                                                                                        .reset_index() )
+
+    # Create a new column with ratings_per_restaurant
+    df_rate_ratings_by_country["ratings_per_restaurant"] = df_rate_ratings_by_country["votes"] / df_rate_ratings_by_country["restaurants"]
+
+    # Use only country and ratings_per_restaurant
+    top_ratings_per_restaurant = df_rate_ratings_by_country.sort_values("ratings_per_restaurant", ascending=False).reset_index(drop=True)
+    
+    top_ratings_per_restaurant = top_ratings_per_restaurant.loc[ :4, ["country", "ratings_per_restaurant" ] ]
+    top_ratings_per_restaurant['ratings_per_restaurant'] = top_ratings_per_restaurant['ratings_per_restaurant'].astype(int)
+
+    
+    return adjust_df(top_ratings_per_restaurant)
+
+
+
+@timed
+def countries_delivery_presence_df(cube):
+    #SA Name of country with best frequency of delivery option.
+
+    # Countries with delivering restaurants: delivering now and unique restaurants, ordered by delivering now
+    countries = cube["countries"]
+
+    df_freq_deliv_by_country = ( countries.loc[ countries["delivering_rows"] > 0, ["delivering_rows", "restaurants"] ].sort_values("delivering_rows", ascending=False)
+                                                                                                                       .reset_index() )
+
+    df_freq_deliv_by_country.columns = [ "country", "delivery_options", "total_restaurants" ]
+
+    # Create a new column with delivery_presence =  delivery_options / total_restaurants
+    df_freq_deliv_by_country["delivery_presence"] = (df_freq_deliv_by_country["delivery_options"] / df_freq_deliv_by_country["total_restaurants"])
+    df_freq_deliv_by_country['delivery_presence'] = df_freq_deliv_by_country['delivery_presence'].apply(lambda x: f'{x:.2%}')
+
+    df_freq_deliv_by_country = df_freq_deliv_by_country[['country', 'total_restaurants', 'delivery_options', 'delivery_presence']]
+
+    
+    return adjust_df(df_freq_deliv_by_country)
+
+
+
+@timed
+def country_ratings_avg_chart(cube):
+    # Best and Worst rated countries
+    
+    # Group by Ratings
+    df_ratings = ( cube["countries"].loc[ : , ["rating_mean"] ].rename(columns={"rating_mean": "aggregate_rating"})
+                                                               .sort_values("aggregate_rating", ascending=False)
+                                                               .reset_index() )
+
+    top3_bottom3 = pd.concat( [df_ratings.head(3), df_ratings.tail(3)] )
+    mean_rating = df_ratings['aggregate_rating'].mean()
+    
+    # Setting ratings colors
+    top3_bottom3['color'] = ['skyblue' if country in top3_bottom3.head(3)['country'].values else 'indianred' for country in top3_bottom3['country']]
+    
+    # Defining chart data
+    fig = go.Figure(data=[go.Bar( x=top3_bottom3['country'],
+                                  y=top3_bottom3['aggregate_rating'],
+                                  text=top3_bottom3['aggregate_rating'],
+                                  marker_color=top3_bottom3['color'], opacity=0.9 )])
+
+    fig.add_shape(type='line', x0=-0.5, x1=len(top3_bottom3)-0.5, y0=mean_rating, y1=mean_rating,
+                  line=dict(color='gray', width=1, dash='dash'))
+
+    fig.update_layout(title_text='Top 3 and Bottom 3 countries on Avg Rating (gray line is overall avg)',
+                      xaxis_title='Country', yaxis_title='Average Rating', bargap=0.1, title_font=dict(size=18.5),
+                      xaxis=dict(tickangle=45, tickmode='array'))
+
+    fig.update_traces(textposition='inside', texttemplate='%{text:.2f}', textfont=dict(size=12), hoverinfo='text+y', insidetextanchor='start')
+
+    return fig
+
+
+
+@timed
+def countries_avg_cost_chart(cube):
+    # Bar plot of average cost for two in dollars in each country
+    df_cost_by_country = ( cube["countries"].loc[ : , ["cost_mean"] ].rename(columns={"cost_mean": "dollar_average_cost_for_two"})
+                                                                     .sort_values("dollar_average_cost_for_two", ascending=False)
+                                                                     .reset_index() )
+
+    # Plot
+    fig = go.Figure()
+
+    fig.add_trace(go.Bar(
+        x=df_cost_by_country['country'],
+        y=df_cost_by_country['dollar_average_cost_for_two'],
+        marker_color='skyblue' ))
+
+    fig.update_layout(
+        title='Average Cost for Two by Country',
+        xaxis_title='Country',
+        yaxis_title='Average Cost for Two (in dollars)',
+        width=1100, title_font=dict(size=24), title_x=0.05,
+        xaxis=dict(tickangle=45, tickmode='array'))
+
+    return fig
+
+
+
+
+# CITIES ----------------------------------------
+
+@timed
+def cities_most_excellent_restaurants_chart(cube):
+    #SA Barplot of cities with most 4.5+ rating restaurants.
+    cities = cube["cities"]
+
+    df_restaurants_by_city_and_good_rating = ( cities.loc[ cities["excellent_restaurants"] > 0, ["excellent_restaurants"] ].sort_values("excellent_restaurants", ascending=False)
+                                                                                                                           .reset_index() )
+
+    df_restaurants_by_city_and_good_rating.columns = ["city", "number_of_well_rated_restaurants"]
+    top_10_cities = df_restaurants_by_city_and_good_rating.loc[ :9, : ]
+    top_10_cities = pd.merge(top_10_cities, cube['city_countries'], on='city', how='inner').drop_duplicates().reset_index(drop=True)
+
+    
+    # Bar chart
+    fig = go.Figure(data=[go.Bar( x=top_10_cities['city'],
+                                  y=top_10_cities['number_of_well_rated_restaurants'],
+                                  hovertemplate=top_10_cities['country'],
+                                  marker_color='skyblue' )])
+
+    fig.update_layout(title_text='Cities with most restaurants rated as Excellent',
+                      xaxis_title='City', yaxis_title='Amount of Excellent Restaurants',
+                      width=1100, title_font=dict(size=24), title_x=0.05)
+    
+
+    return fig
+
+
+
+@timed
+def cities_restaurant_pop_chart(cube):
+    # Barplot of amount of cities with certain restaurant populations
+    df_restaurants_by_city = ( cube["cities"].loc[ : , ["restaurants"] ].sort_values("restaurants", ascending=False)
+                                                                         .reset_index() )
+
+    df_restaurants_by_city.columns = ["city", "number_of_restaurants"]
+
+
+    cat = ['1-20', '21-40', '41-60', '61+']
+
+    df_restaurants_by_city['number_of_restaurants'] = df_restaurants_by_city['number_of_restaurants'].apply( lambda x: cat[0] if x<=20 else 
+                                                                                                                       cat[1] if ( (x>20) & (x<=40) ) else
+                                                                                                                       cat[2] if ( (x>40) & (x<=60) ) else
+                                                                                                                       cat[3] )
+
+    df_restaurants_by_city = df_restaurants_by_city.loc[ :, [ 'number_of_restaurants', 'city' ] ].groupby('number_of_restaurants').count().reset_index()
+
+
+    # Barplot
+    fig = go.Figure()
+
+    fig.add_trace(go.Bar(
+                    x=df_restaurants_by_city['number_of_restaurants'],
+                    y=df_restaurants_by_city['city'],
+                    marker_color='indianred'))
+
+    fig.update_layout(
+        title='How many cities have restaurant population of 1-20, 21-40, 41-60 and 61+?',
+        xaxis_title='Restaurant population rate',
+        yaxis_title='Amount of Cities', width=500, title_font=dict(size=16),
+        xaxis=dict(tickangle=45, tickmode='array'))
+
+    return fig
+
+
+
+@timed
+def cities_delicery_chart(cube):
+    #SA Pie chart delivery presence
+    cities_delivery_option = ( cube["cities"].loc[ : , ["delivering_rows"] ].rename(columns={"delivering_rows": "is_delivering_now"}).reset_index() )
+
+    
+    # Labels and Values for Pie Chart
+    cities_deliver_label = [ 'Yes', 'No' ]
+    cities_deliver_values = [ cities_delivery_option[cities_delivery_option['is_delivering_now'] != 0].shape[0], 
+                              cities_delivery_option[cities_delivery_option['is_delivering_now'] == 0].shape[0] ]
+
+    # Pie chart
+    fig = go.Figure(data=[go.Pie( labels=cities_deliver_label, 
+                                  values=cities_deliver_values, 
+                                  marker=dict(colors=['dodgerblue', 'indianred']) )])
+
+    fig.update_layout( title_text='% of cities that have Delivery option', title_x=0.25 )
+
+    return fig
+
+
+
+@timed
+def cities_cost_df(cube):
+    #SA Table with most expensive cities for two people dishes.
+    
+    # Most expensive cities
+    df_city_by_cost_for_two = ( cube["cities"].loc[ : , ["cost_mean"] ].rename(columns={"cost_mean": "dollar_average_cost_for_two"})
+                                                                       .sort_values("dollar_average_cost_for_two", ascending=False)
+                                                                       .reset_index() )
+
+    top_cities_df = df_city_by_cost_for_two.head(5)
+    
+    # Add cities' countries
+    top_cities_df = pd.merge(top_cities_df, cube['city_countries'], on='city', how='inner').drop_duplicates().reset_index(drop=True)
+
+
+    # Add countries' cost rankings
+    df_cost_by_country = ( cube["countries"].loc[ : , ["cost_mean"] ].rename(columns={"cost_mean": "dollar_average_cost_for_two"})
+                                                                     .sort_values("dollar_average_cost_for_two", ascending=False)
+                                                                     .reset_index() )
+
+    df_cost_by_country['country_cost_rank'] = df_cost_by_country['dollar_average_cost_for_two'].rank(ascending=False).astype(int)
+    df_cost_by_country.drop( ['dollar_average_cost_for_two'], axis=1, inplace=True )
+
+    cities_cost_rank_df = pd.merge(top_cities_df, df_cost_by_country, on='country', how='inner').drop_duplicates()
+    
+    return adjust_df(cities_cost_rank_df)
+
+
+    
+@timed
+def cities_diversity_cuisine_chart(cube):
+    #SA Table with cities with most variety of cuisines.
+    cities_cuisines_df = ( cube["cities"].loc[ : , ["cuisines"] ].sort_values("cuisines", ascending=False)
+                                                                 .reset_index() )
+
+    cities_cuisines_df['diversity'] = cities_cuisines_df['cuisines'].apply( lambda x: 'low' if x<10 else 'high' )
+
+
+    # Labels and Values for Pie Chart
+    diversity = [ 'High', 'Low' ]
+
+    diversity_counts = []
+    diversity_counts.append( cities_cuisines_df[ cities_cuisines_df['diversity'] == 'high' ].shape[0] )
+    diversity_counts.append( cities_cuisines_df[ cities_cuisines_df['diversity'] == 'low' ].shape[0] )
+
+    # Pie chart
+    fig = go.Figure(data=[go.Pie( labels=diversity, 
+                                  values=diversity_counts, 
+                                  marker=dict(colors=['dodgerblue', 'indianred']) )])
+
+    fig.update_layout( title_text='Most Cities have high or low diversity of Cuisines?', title_x=0.25 )
+
+    return fig
@@ -0,0 +1,132 @@
+# IMPORTS
+import numpy as np
+import pandas as pd
+
+from branca.colormap import linear
+
+from zomato.data import CSV_PATH
+from zomato.ingest import DEFAULT_CHUNKSIZE, fold_batches
+from zomato.maps import ZoomLevels, exact_ratings, mercator_pixels
+from zomato.profiling import timed
+
+
+# Quadtree levels (slippy-map tile zooms) the grid is computed at. A level-L cell is one 256px map tile at
+# zoom L, and its four children are the cells of level L + 1.
+GRID_LEVELS = range(4, 14)
+
+# The map shows the level this many steps finer than its zoom, i.e. cells of 256 / 2**3 = 32 screen pixels.
+GRID_ZOOM_OFFSET = 3
+
+# Metrics a density layer can be colored by: label -> grid column.
+GRID_METRICS = { "Restaurants": "count",
+                 "Avg rating": "rating_mean",
+                 "Avg cost for two": "cost_mean" }
+
+
+
+# MULTI-RESOLUTION GRID
+# ==============================================================================================================================================
+
+def grid_cells(df, level=max(GRID_LEVELS)):
+    # Restaurant count and sums of aggregate_rating and dollar_average_cost_for_two per quadtree cell of one level.
+    # Cells of several frames add up (see merge_grid_cells).
+    x, y = mercator_pixels( df["latitude"].to_numpy(), df["longitude"].to_numpy(), level )
+
+    return ( pd.DataFrame( { "x": (x // 256).astype(np.int64),
+                             "y": (y // 256).astype(np.int64),
+                             "count": 1,
+                             "rating_sum": exact_ratings( df["aggregate_rating"] ),
+                             "cost_sum": df["dollar_average_cost_for_two"].to_numpy(dtype="float64") } )
+               .groupby( ["x", "y"] ).sum()
+               .reset_index() )
+
+
+
+def merge_grid_cells(first, second):
+    return pd.concat( [first, second], ignore_index=True ).groupby( ["x", "y"] ).sum().reset_index()
+
+
+
+def grid_from_cells(cells, levels=GRID_LEVELS):
+    # Every level of the grid from grid_cells of the finest one: each coarser level is summed up from the one below.
+    levels = sorted(levels)
+
+    grid = []
+    for level in reversed(levels):
+        shift = levels[-1] - level
+        level_cells = ( cells.assign( x=cells["x"] // 2 ** shift, y=cells["y"] // 2 ** shift )
+                             .groupby( ["x", "y"] ).sum()
+                             .reset_index() )
+
+        grid.append( level_cells.assign(level=level) )
+
+    grid = pd.concat( grid[::-1], ignore_index=True )
+    grid["rating_mean"] = grid["rating_sum"] / grid["count"]
+    grid["cost_mean"] = grid["cost_sum"] / grid["count"]
+
+    return grid.loc[ : , ["level", "x", "y", "count", "rating_sum", "cost_sum", "rating_mean", "cost_mean"] ]
+
+
+
+def quadtree_grid(df, levels=GRID_LEVELS):
+    # Restaurant count, mean aggregate_rating and mean dollar_average_cost_for_two per quadtree cell, for every level.
+    # Only the finest level is computed from the restaurants; each coarser level is summed up from the one below.
+    return grid_from_cells( grid_cells( df, max(levels) ), levels )
+
+
+
+def stream_quadtree_grid(path=CSV_PATH, chunksize=DEFAULT_CHUNKSIZE):
+    # quadtree_grid of a CSV too large to load, fed batch by batch (see zomato.ingest).
+    return grid_from_cells( fold_batches(grid_cells, merge_grid_cells, path, chunksize) )
+
+
+
+def tile_bounds(level, x, y):
+    # South, west, north and east edges (degrees) of quadtree cells.
+    n = 2.0 ** np.asarray(level)
+
+    def latitude(tile_y):
+        return np.degrees( np.arctan( np.sinh( np.pi * (1 - 2 * tile_y / n) ) ) )
+
+    return latitude(y + 1), x / n * 360.0 - 180.0, latitude(y), (x + 1) / n * 360.0 - 180.0
+
+
+
+# DENSITY LAYER
+# ==============================================================================================================================================
+
+# Rectangle of a quadtree cell, from rows of density_levels().
+GRID_DRAW = """
+    function (row) {
+        return L.rectangle([[row[0], row[1]], [row[2], row[3]]], {color: row[4], weight: 0, fillOpacity: 0.55})
+                .bindTooltip(row[5]);
+    }
+    """
+
+
+
+def density_levels(grid, metric):
+    # {level: [[south, west, north, east, color, tooltip], ...]} with cells colored by a GRID_METRICS metric.
+    # Colors are scaled per level (counts on a log scale), so every zoom shows its own contrast.
+    column = GRID_METRICS[metric]
+    levels = {}
+
+    for level, cells in grid.groupby("level"):
+        values = np.log1p(cells[column]) if column == "count" else cells[column]
+        colormap = linear.YlOrRd_09.scale( values.min(), max(values.max(), values.min() + 1e-9) )
+
+        south, west, north, east = tile_bounds( level, cells["x"].to_numpy(), cells["y"].to_numpy() )
+        tooltips = ( cells["count"].astype(str) + " restaurants<br>Avg rating: " + cells["rating_mean"].round(2).astype(str)
+                     + "<br>Avg cost for two: $" + cells["cost_mean"].round(2).astype(str) )
+
+        levels[int(level)] = [ [ round(s, 5), round(w, 5), round(n, 5), round(e, 5), colormap(v), tooltip ]
+                               for s, w, n, e, v, tooltip in zip(south, west, north, east, values, tooltips) ]
+
+    return levels
+
+
+
+@timed
+def density_layer(grid, metric):
+    # Map element drawing the grid level that matches the map zoom, colored by metric.
+    return ZoomLevels( density_levels(grid, metric), GRID_DRAW, zoom_offset=GRID_ZOOM_OFFSET )
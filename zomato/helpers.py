@@ -0,0 +1,8 @@
+# HELPER FUNCTIONS
+# ==============================================================================================================================================
+
+def adjust_df(df):
+    # Index starting from 1
+    df.index = df.index + 1
+    
+    return df
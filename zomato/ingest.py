@@ -0,0 +1,111 @@
+# IMPORTS
+import os
+
+import numpy as np
+import pandas as pd
+
+from zomato.data import CSV_PATH, clean_code
+
+
+# Rows per batch when streaming the CSV. Set ZOMATO_CHUNKSIZE to make the pages ingest in batches
+# instead of loading the whole file (for exports that don't fit in memory).
+CHUNKSIZE = int(os.environ.get("ZOMATO_CHUNKSIZE", 0)) or None
+
+DEFAULT_CHUNKSIZE = 200_000
+
+
+
+# STREAMING INGEST
+# ==============================================================================================================================================
+
+class SeenRows:
+    # Set of 64-bit keys (restaurant IDs) seen so far, at 8 bytes per key.
+    # Kept as a few sorted runs that are merged as they grow (like an LSM tree), so adding a batch
+    # never re-sorts everything seen before.
+    def __init__(self):
+        self.runs = []
+
+
+    def contains(self, hashes):
+        # Boolean mask of the keys already seen.
+        seen = np.zeros(len(hashes), dtype=bool)
+
+        for run in self.runs:
+            pos = np.searchsorted(run, hashes).clip(max=len(run) - 1)
+            seen |= run[pos] == hashes
+
+        return seen
+
+
+    def add(self, hashes):
+        if len(hashes) == 0:
+            return
+
+        self.runs.append( np.unique(hashes) )
+
+        while len(self.runs) > 1 and len(self.runs[-2]) <= 2 * len(self.runs[-1]):
+            last = self.runs.pop()
+            self.runs[-1] = np.union1d(self.runs[-1], last)
+
+
+    def __len__(self):
+        return sum(len(run) for run in self.runs)
+
+
+
+def raw_ids(chunk):
+    # Restaurant IDs of a raw batch as int64 (-1 where missing: those rows are dropped by the cleaning anyway).
+    return chunk["Restaurant ID"].fillna(-1).to_numpy(dtype="int64")
+
+
+
+def repeated_ids(path=CSV_PATH, chunksize=DEFAULT_CHUNKSIZE):
+    # IDs found on more than one raw row of the CSV, reading only that column.
+    seen, repeated = SeenRows(), SeenRows()
+
+    for chunk in pd.read_csv(path, usecols=["Restaurant ID"], chunksize=chunksize):
+        ids = raw_ids(chunk)
+        again = seen.contains(ids) | pd.Series(ids).duplicated(keep=False).to_numpy()
+
+        repeated.add( ids[again] )
+        seen.add(ids)
+
+    return repeated
+
+
+
+def read_batches(path=CSV_PATH, chunksize=DEFAULT_CHUNKSIZE):
+    # Stream the CSV in batches of at most chunksize raw rows and yield each one cleaned by clean_code;
+    # together the batches hold the same rows as clean_code(pd.read_csv(path)).
+    # A first pass over the ID column finds the restaurants with more than one row. Their rows, wherever
+    # they are in the file, are held back and cleaned together in a last batch, where deduplicate resolves
+    # them by DEDUP_POLICY (and only they are hashed). Every other row is yielded with its batch, so memory
+    # holds one batch, the IDs and the repeated restaurants' rows.
+    repeated = repeated_ids(path, chunksize)
+    held = []
+
+    for chunk in pd.read_csv(path, chunksize=chunksize):
+        again = repeated.contains( raw_ids(chunk) )
+
+        if again.any():
+            held.append( chunk.loc[ again, : ] )
+
+        if not again.all():
+            yield clean_code( chunk.loc[ ~again, : ] )
+
+    # The held rows are in file order and keep their line numbers as index, so "latest" is still the last row in the file.
+    if held:
+        yield clean_code( pd.concat(held) )
+
+
+
+def fold_batches(partial, merge, path=CSV_PATH, chunksize=DEFAULT_CHUNKSIZE):
+    # partial(batch) of every batch of read_batches, merged two at a time by merge: memory holds one batch and
+    # the merged partial (None for a file without batches).
+    result = None
+
+    for batch in read_batches(path, chunksize):
+        batch_partial = partial(batch)
+        result = batch_partial if result is None else merge(result, batch_partial)
+
+    return result
@@ -0,0 +1,83 @@
+# IMPORTS
+import functools
+import io
+import os
+
+import streamlit as st
+
+from zomato.lazy import LazyModule
+
+
+# Only needed to resize an image, once per process.
+Image = LazyModule("PIL.Image")
+
+# Images of the app, relative to its root (where `streamlit run Home.py` is launched).
+IMAGE_DIR = 'img'
+
+LOGO = "zomato_logo.png"
+LOGO_WIDTH = 160
+
+# Centers the logo in the sidebar.
+SIDEBAR_CSS = """
+    <style>
+        [data-testid=stSidebar] [data-testid=stImage]{
+            text-align: center;
+            display: block;
+            margin-left: auto;
+            margin-right: auto;
+            width: 100%;
+        }
+    </style>
+    """
+
+# My LinkedIn URL
+LINKEDIN_URL = "https://www.linkedin.com/in/victor-bongestab/"
+AUTHOR = "Victor Bongestab"
+
+
+
+# IMAGES
+# ==============================================================================================================================================
+
+@functools.lru_cache(maxsize=None)
+def image_bytes(name, width=None):
+    # PNG bytes of img/<name>, resized to width pixels (keeping its proportions) when given. Read, decoded and
+    # encoded once per process: st.image sends bytes as they are, where an image opened on every run would be
+    # decoded, resized and encoded again each time.
+    path = os.path.join(IMAGE_DIR, name)
+
+    if width is None:
+        with open(path, 'rb') as f:
+            return f.read()
+
+    with Image.open(path) as image:
+        height = round( image.height * width / image.width )
+        buffer = io.BytesIO()
+        image.resize( (width, height), Image.Resampling.LANCZOS ).save(buffer, format="PNG")
+
+    return buffer.getvalue()
+
+
+
+# SIDEBAR
+# ==============================================================================================================================================
+
+def sidebar():
+    # The sidebar every page starts with: logo, welcome and the author's LinkedIn (the filters come after it,
+    # see zomato.filters).
+
+    # Imagem da barra lateral
+    st.sidebar.image( image_bytes(LOGO, LOGO_WIDTH), width=LOGO_WIDTH )
+    st.markdown(SIDEBAR_CSS, unsafe_allow_html=True)
+
+    st.sidebar.markdown("""---""")
+
+
+    # Primeira seção da barra lateral
+    st.sidebar.markdown('# Welcome! ')
+    st.sidebar.markdown("Let's take a tour around the company.")
+    st.sidebar.markdown("""---""")
+
+
+    # Segunda seção da barra lateral
+    st.sidebar.markdown(f"[![LinkedIn](https://img.icons8.com/color/48/000000/linkedin.png)]({LINKEDIN_URL}) {AUTHOR}")
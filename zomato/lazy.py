@@ -0,0 +1,36 @@
+# IMPORTS
+import importlib
+import threading
+
+
+# DEFERRED IMPORTS
+# ==============================================================================================================================================
+
+class LazyModule:
+    # Stand-in for a module that is only imported when one of its attributes is first used, so a page
+    # doesn't pay for plotly (or the like) until it draws something with it:
+    #
+    #   go = LazyModule("plotly.graph_objects")
+    #   fig = go.Figure()        # plotly.graph_objects is imported here
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+        self._lock = threading.Lock()
+
+
+    def _load(self):
+        if self._module is None:
+            with self._lock:
+                if self._module is None:
+                    self._module = importlib.import_module(self._name)
+
+        return self._module
+
+
+    def __getattr__(self, attr):
+        # Only called for attributes the stand-in doesn't have itself.
+        return getattr( self._load(), attr )
+
+
+    def __repr__(self):
+        return f"<lazy module {self._name!r}{'' if self._module is None else ' (imported)'}>"
@@ -0,0 +1,274 @@
+# IMPORTS
+import html
+import json
+
+import numpy as np
+import pandas as pd
+
+import folium
+from folium.plugins import FastMarkerCluster
+from branca.element import MacroElement
+from jinja2 import Template
+
+from zomato.data import CSV_PATH
+from zomato.ingest import DEFAULT_CHUNKSIZE, fold_batches
+from zomato.profiling import timed
+
+
+# Above this many restaurants the world map defaults to server-side clusters instead of one marker each.
+MAX_MARKERS = 20_000
+
+# Zoom levels clustered on the server; past MAX_CLUSTER_ZOOM the finest level is kept.
+# At zoom 10 a cell is ~10 km wide, so the payload depends on geography, not on restaurant count.
+MIN_CLUSTER_ZOOM = 1
+MAX_CLUSTER_ZOOM = 10
+
+# Size (in screen pixels) of the grid cells points are clustered into at each zoom level.
+CELL_PX = 60
+
+# How the columns of cluster_cells add up.
+CELL_AGGREGATES = { "count": "sum", "latitude": "sum", "longitude": "sum", "aggregate_rating": "sum",
+                    "restaurant_name": "first", "city": "first" }
+
+MAP_MODES = [ "Clusters", "Markers" ]
+
+
+
+# SERVER-SIDE CLUSTERING
+# ==============================================================================================================================================
+
+def mercator_pixels(latitude, longitude, zoom):
+    # Web Mercator pixel coordinates (as drawn by Leaflet) of the points at a zoom level.
+    size = 256 * 2.0 ** zoom
+    lat = np.radians( np.clip(latitude, -85.05112878, 85.05112878) )
+
+    x = ( np.asarray(longitude) + 180.0 ) / 360.0 * size
+    y = ( 1.0 - np.log( np.tan(lat) + 1.0 / np.cos(lat) ) / np.pi ) / 2.0 * size
+
+    return x, y
+
+
+
+def exact_ratings(ratings):
+    # Ratings (one decimal) as float64 of their float32 values, the schema's dtype (see zomato.schema). Sums of
+    # those are exact, so they don't depend on how the rows were split into batches or ordered.
+    return np.asarray(ratings, dtype="float32").astype("float64")
+
+
+
+def cluster_cells(df, zoom, cell_px=CELL_PX):
+    # Restaurants grouped into cell_px x cell_px screen cells at a zoom level, indexed by cell: their count, the
+    # sums of their coordinates and ratings, and the name and city of the first one. Cells of several frames
+    # add up (see merge_cells).
+    x, y = mercator_pixels( df["latitude"].to_numpy(), df["longitude"].to_numpy(), zoom )
+
+    cells = pd.DataFrame( { "cell_x": (x // cell_px).astype(np.int64),
+                            "cell_y": (y // cell_px).astype(np.int64),
+                            "count": 1,
+                            "latitude": df["latitude"].to_numpy(),
+                            "longitude": df["longitude"].to_numpy(),
+                            "aggregate_rating": exact_ratings( df["aggregate_rating"] ),
+                            "restaurant_name": np.asarray(df["restaurant_name"], dtype=object),
+                            "city": np.asarray(df["city"], dtype=object) } )
+
+    return cells.groupby( ["cell_x", "cell_y"] ).agg(CELL_AGGREGATES)
+
+
+
+def merge_cells(first, second):
+    # The cells of two frames' cluster_cells at the same zoom level, added up.
+    return pd.concat( [first, second] ).groupby( level=["cell_x", "cell_y"] ).agg(CELL_AGGREGATES)
+
+
+
+def grid_clusters(df, zoom, cell_px=CELL_PX):
+    # Restaurants grouped into cell_px x cell_px screen cells at a zoom level: centroid, count and mean rating.
+    # Single-restaurant cells keep the restaurant's name and city for their popup.
+    return _cluster_means( cluster_cells(df, zoom, cell_px) )
+
+
+
+def _cluster_means(cells):
+    # Centroid and mean rating of every cell of cluster_cells.
+    count = cells["count"]
+    return cells.assign( latitude=cells["latitude"] / count, longitude=cells["longitude"] / count,
+                         aggregate_rating=cells["aggregate_rating"] / count ).reset_index(drop=True)
+
+
+
+def cluster_partial(df, min_zoom=MIN_CLUSTER_ZOOM, max_zoom=MAX_CLUSTER_ZOOM, cell_px=CELL_PX):
+    # {zoom: cluster_cells} of every clustered zoom level.
+    return { zoom: cluster_cells(df, zoom, cell_px) for zoom in range(min_zoom, max_zoom + 1) }
+
+
+
+def merge_cluster_partials(first, second):
+    return { zoom: merge_cells( first[zoom], second[zoom] ) for zoom in first }
+
+
+
+def finish_clusters(partial):
+    # {zoom: [[lat, lon, count, popup], ...]} for every zoom level of a cluster_partial, ready to embed in the map.
+    levels = {}
+
+    for zoom, cells in partial.items():
+        clusters = _cluster_means(cells)
+
+        popups = np.where( clusters["count"] == 1,
+                           clusters["restaurant_name"].map(html.escape) + "<br>" + clusters["city"].map(html.escape) + "<br>Rating: " + clusters["aggregate_rating"].round(1).astype(str),
+                           clusters["count"].astype(str) + " restaurants<br>Avg rating: " + clusters["aggregate_rating"].round(2).astype(str) )
+
+        levels[zoom] = [ [ round(lat, 5), round(lon, 5), int(count), popup ]
+                         for lat, lon, count, popup in zip( clusters["latitude"], clusters["longitude"], clusters["count"], popups ) ]
+
+    return levels
+
+
+
+def cluster_levels(df, min_zoom=MIN_CLUSTER_ZOOM, max_zoom=MAX_CLUSTER_ZOOM, cell_px=CELL_PX):
+    # {zoom: [[lat, lon, count, popup], ...]} for every clustered zoom level, ready to embed in the map.
+    return finish_clusters( cluster_partial(df, min_zoom, max_zoom, cell_px) )
+
+
+
+def stream_cluster_levels(path=CSV_PATH, chunksize=DEFAULT_CHUNKSIZE):
+    # cluster_levels of a CSV too large to load, fed batch by batch (the cells' sums add up; see zomato.ingest).
+    return finish_clusters( fold_batches(cluster_partial, merge_cluster_partials, path, chunksize) )
+
+
+
+class ZoomLevels(MacroElement):
+    # Shows the rows of the precomputed level matching the map zoom (plus zoom_offset), each drawn by the
+    # JS function `draw(row)`. Every level is kept as a plain JS array and only turned into Leaflet layers
+    # the first time it is viewed.
+    _template = Template("""
+        {% macro script(this, kwargs) %}
+            (function() {
+                var map = {{ this._parent.get_name() }};
+                var levels = {{ this.levels }};
+                var draw = {{ this.draw }};
+                var layers = {};
+                var current = null;
+
+                function levelLayer(rows) {
+                    var layer = L.layerGroup();
+                    for (var i = 0; i < rows.length; i++) {
+                        draw(rows[i]).addTo(layer);
+                    }
+                    return layer;
+                }
+
+                function show() {
+                    var level = Math.min( Math.max(Math.round(map.getZoom()) + {{ this.zoom_offset }}, {{ this.min_level }}), {{ this.max_level }} );
+                    if (level === current) { return; }
+                    if (current !== null) { map.removeLayer(layers[current]); }
+                    if (!(level in layers)) { layers[level] = levelLayer(levels[level]); }
+                    layers[level].addTo(map);
+                    current = level;
+                }
+
+                map.on('zoomend', show);
+                show();
+            })();
+        {% endmacro %}
+        """)
+
+    def __init__(self, levels, draw, zoom_offset=0):
+        super().__init__()
+        self._name = "ZoomLevels"
+        self.levels = json.dumps(levels)
+        self.draw = draw
+        self.zoom_offset = zoom_offset
+        self.min_level = min(levels)
+        self.max_level = max(levels)
+
+
+
+# Circle sized by the number of restaurants in the cluster, from rows of cluster_levels().
+CLUSTER_DRAW = """
+    function (row) {
+        var radius = row[2] == 1 ? 4 : 6 + 3 * Math.log(row[2]);
+        return L.circleMarker([row[0], row[1]], {radius: radius, color: 'indianred', weight: 1, fillOpacity: 0.6})
+                .bindTooltip(String(row[2]))
+                .bindPopup(row[3]);
+    }
+    """
+
+
+
+# WORLD MAP
+# ==============================================================================================================================================
+
+def _base_map(df):
+    return folium.Map( location=[ df['latitude'].mean(), df['longitude'].mean() ], zoom_start=2.4 )
+
+
+
+def _levels_center(levels):
+    # Mean latitude and longitude of the restaurants of cluster_levels (their clusters' centroids weighted by counts).
+    rows = np.array( [ row[:3] for row in levels[ min(levels) ] ], dtype="float64" )
+    return np.average( rows[:, :2], axis=0, weights=rows[:, 2] ).tolist()
+
+
+
+@timed
+def cluster_map(df, levels=None):
+    # World map of server-side clusters: the page ships centroids and counts, not one marker per restaurant.
+    # df may be None when the levels are given (streamed from the CSV): the map is then centered from them.
+    if df is None:
+        mapa = folium.Map( location=_levels_center(levels), zoom_start=2.4 )
+    else:
+        mapa = _base_map(df)
+    ZoomLevels( levels if levels is not None else cluster_levels(df), CLUSTER_DRAW ).add_to(mapa)
+
+    return mapa
+
+
+
+@timed
+def marker_map(df):
+    # World map with one marker per restaurant, clustered in the browser from a single JS array.
+    mapa = _base_map(df)
+
+    data = df[['latitude', 'longitude', 'city', 'restaurant_name', 'aggregate_rating']].values.tolist()
+    for row in data:
+        row[2], row[3] = html.escape(str(row[2])), html.escape(str(row[3]))
+
+    callback = """
+        var callback = function (row) {
+            var marker = L.marker(new L.LatLng(row[0], row[1]));
+            marker.bindPopup(row[3] + '<br>' + row[2] + '<br>Rating: ' + row[4]);
+            return marker;
+        };
+        """
+
+    FastMarkerCluster(data=data, callback=callback).add_to(mapa)
+
+    return mapa
+
+
+
+@timed
+def nearby_map(df, lat, lon, radius_km=None):
+    # Map of the restaurants of df (the result of a spatial query) around the point, with the search circle.
+    mapa = folium.Map( location=[lat, lon], zoom_start=12 )
+
+    folium.CircleMarker( [lat, lon], radius=5, color="black", fill=True, tooltip="Search point" ).add_to(mapa)
+    if radius_km:
+        folium.Circle( [lat, lon], radius=radius_km * 1000, color="indianred", fill=False ).add_to(mapa)
+
+    for row in df[['latitude', 'longitude', 'city', 'restaurant_name', 'aggregate_rating']].itertuples(index=False):
+        folium.Marker( [row.latitude, row.longitude],
+                       popup=f"{html.escape(str(row.restaurant_name))}<br>{html.escape(str(row.city))}<br>Rating: {row.aggregate_rating}" ).add_to(mapa)
+
+    if len(df):
+        mapa.fit_bounds( [ [ min(df['latitude'].min(), lat), min(df['longitude'].min(), lon) ],
+                           [ max(df['latitude'].max(), lat), max(df['longitude'].max(), lon) ] ] )
+
+    return mapa
+
+
+
+def default_map_mode(n_restaurants):
+    # One marker per restaurant while that stays light, server-side clusters above MAX_MARKERS.
+    return "Markers" if n_restaurants <= MAX_MARKERS else "Clusters"
@@ -0,0 +1,149 @@
+# IMPORTS
+import contextvars
+import functools
+import json
+import os
+import threading
+import time
+import uuid
+
+import pandas as pd
+
+
+# Append the stages of every page run to this file as JSON lines.
+PROFILE_LOG = os.environ.get("ZOMATO_PROFILE_LOG")
+
+# Show the stages of the current run in a sidebar panel.
+DEBUG = os.environ.get("ZOMATO_DEBUG", "") not in ("", "0")
+
+# Stage of the page run in progress (each Streamlit session runs its script in its own thread / context).
+_run = contextvars.ContextVar("zomato_run", default=None)
+
+# Nesting depth of the stage in progress. Tasks run in a thread pool (see zomato.scheduler) start from a copy
+# of the context they were submitted in, so their stages nest under it without changing the page's depth.
+_depth = contextvars.ContextVar("zomato_depth", default=0)
+_log_lock = threading.Lock()
+
+
+
+# STAGES
+# ==============================================================================================================================================
+
+def rss_bytes():
+    # Resident memory of the process, or None where /proc isn't available.
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return None
+
+
+
+class Run:
+    # Timings and memory deltas of the stages of one page run, in the order they started.
+    def __init__(self, page):
+        self.id = uuid.uuid4().hex[:12]
+        self.page = page
+        self.start = time.perf_counter()
+        self.stages = []
+
+
+    def records(self):
+        return [ dict(stage, run=self.id, page=self.page) for stage in self.stages ]
+
+
+
+def start_run(page):
+    # Begin collecting the stages of this page run (a rerun of the script starts a new one).
+    run = Run(page)
+    _run.set(run)
+    return run
+
+
+
+class stage:
+    # Time a block (`with stage("clean_code"):`) and record it in the current run, with the change in
+    # resident memory. Outside of a page run it does nothing.
+    def __init__(self, name, kind="function", **fields):
+        self.name, self.kind, self.fields = name, kind, fields
+
+
+    def __enter__(self):
+        self.run = _run.get()
+        if self.run is not None:
+            depth = _depth.get()
+            self.record = dict( stage=self.name, kind=self.kind, depth=depth, **self.fields )
+            self.run.stages.append(self.record)
+            self.token = _depth.set(depth + 1)
+            self.rss = rss_bytes()
+            self.begin = time.perf_counter()
+        return self
+
+
+    def note(self, **fields):
+        # Add fields (counts found while the block ran) to the stage's record.
+        if self.run is not None:
+            self.record.update(fields)
+
+
+    def __exit__(self, *exc):
+        if self.run is not None:
+            end = time.perf_counter()
+            rss = rss_bytes()
+            _depth.reset(self.token)
+            self.record.update( start_s=round(self.begin - self.run.start, 6), seconds=round(end - self.begin, 6),
+                                memory_delta_mb=None if rss is None or self.rss is None else round( (rss - self.rss) / 1e6, 3 ) )
+        return False
+
+
+
+def timed(function):
+    # Decorator recording every call of function as a stage named after it.
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        with stage(function.__name__):
+            return function(*args, **kwargs)
+
+    return wrapper
+
+
+
+# REPORTING
+# ==============================================================================================================================================
+
+def write_log(run, path):
+    # Append the run's stages to path, one JSON object per line.
+    lines = "".join( json.dumps(record) + "\n" for record in run.records() )
+
+    with _log_lock, open(path, "a", encoding="utf-8") as f:
+        f.write(lines)
+
+
+
+def stages_frame(run):
+    # The run's stages as a table, nested stages indented under the one they ran in.
+    frame = pd.DataFrame( run.stages, columns=["stage", "kind", "depth", "start_s", "seconds", "memory_delta_mb"] )
+    frame["stage"] = [ "· " * depth + name for depth, name in zip(frame["depth"], frame["stage"]) ]
+    return frame.drop(columns="depth")
+
+
+
+def finish_run(sidebar=None):
+    # End the current run: log it when ZOMATO_PROFILE_LOG is set and show it in the sidebar when ZOMATO_DEBUG is.
+    run = _run.get()
+    if run is None:
+        return None
+
+    _run.set(None)
+    run.stages.append( dict( stage=run.page, kind="page", depth=0, start_s=0.0, seconds=round(time.perf_counter() - run.start, 6),
+                             memory_delta_mb=None ) )
+
+    if PROFILE_LOG:
+        write_log(run, PROFILE_LOG)
+
+    if DEBUG and sidebar is not None:
+        panel = sidebar.expander("Debug: stage timings")
+        panel.caption(f"Run {run.id} of {run.page}: {run.stages[-1]['seconds']:.3f} s")
+        panel.dataframe( stages_frame(run) )
+
+    return run
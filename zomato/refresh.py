@@ -0,0 +1,148 @@
+# Incremental refresh: add a delta file of new and updated restaurants to the dataset without cleaning or aggregating
+# it all again.
+#
+#   python -m zomato.refresh new_restaurants.csv
+#
+# The delta is cleaned on its own and appended to the CSV. Rows of new restaurants are added into the cached frame and
+# aggregate cube; rows whose restaurant_id is already in the dataset replace that restaurant's rows, their old
+# measures taken out of the cube and the new ones added. Updates follow the "latest" deduplication policy (the
+# appended row is the restaurant's last in the CSV, the one a rebuild keeps): under the other policies they are
+# skipped with a warning. Called inside the app's process, the pages keep serving from
+# memory; from the command line, the parquet snapshot is rewritten for the app to load.
+
+# IMPORTS
+import argparse
+import json
+import logging
+import sys
+import threading
+
+import pandas as pd
+
+from zomato.cube import MULTI_CUISINE, build_cube, load_cube, update_cube
+from zomato.data import (CSV_PATH, DEDUP_POLICY, append_rows, cached, clean_base, convert_currency, file_fingerprint, load_base, load_data,
+                         load_rates, replace_cached, snapshot_metadata)
+from zomato.ingest import SeenRows, raw_ids
+from zomato.profiling import stage
+from zomato.schema import apply_schema, concat_cleaned, row_hashes
+from zomato.snapshot import snapshot_path, write_snapshot
+
+
+logger = logging.getLogger(__name__)
+
+# Known restaurant IDs listed in the warning about skipped updates.
+SHOWN_IDS = 10
+
+# One refresh at a time. The data caches have a lock of their own: pages keep reading the current version
+# while a refresh builds the next one.
+_lock = threading.Lock()
+
+
+
+# INCREMENTAL REFRESH
+# ==============================================================================================================================================
+
+def restaurant_ids(df):
+    # Sorted runs of the restaurant IDs in a cleaned frame; checking a delta against them costs O(delta * log n).
+    ids = SeenRows()
+    ids.add( df["restaurant_id"].to_numpy(dtype="int64") )
+    return ids
+
+
+
+def refresh(delta_path, path=CSV_PATH, snapshot=True):
+    # Add the new restaurants of a raw delta CSV to the dataset at path and apply its updates of known ones;
+    # returns counts of what happened. Everything but rewriting the snapshot (plain I/O, skipped with
+    # snapshot=False) scales with the delta: the cube's sums and distinct counts are updated from the aggregates
+    # of the delta and of the rows it replaces.
+    with _lock:
+        key = file_fingerprint(path)
+        base = load_base(path)
+        df = load_data(path)
+        cube = load_cube(path)
+        # Every restaurant of the CSV is known, including those the currency conversion drops.
+        ids = cached( "restaurant_ids", lambda: restaurant_ids(base), path )
+
+        with stage("read_delta", "load"):
+            raw = pd.read_csv(delta_path)
+
+        columns = pd.read_csv(path, nrows=0).columns
+        if list(raw.columns) != list(columns):
+            raise ValueError(f"{delta_path} doesn't have the columns of {path}")
+
+        # Missing IDs become -1 (never a restaurant's), as in the streamed ingest.
+        known = ids.contains( raw_ids(raw) )
+        applied_raw = raw
+
+        if known.any() and DEDUP_POLICY != "latest":
+            # A rebuild could keep the old row (max_votes) or both (flag): only new restaurants are added.
+            skipped = raw.loc[ known, "Restaurant ID" ].unique().tolist()
+            logger.warning("Skipped %d rows of %s about restaurants already in the dataset (updates need ZOMATO_DEDUP=latest): IDs %s%s",
+                           known.sum(), delta_path, skipped[:SHOWN_IDS], " ..." if len(skipped) > SHOWN_IDS else "")
+            applied_raw = raw.loc[ ~known, : ]
+
+        report = { "delta_rows": len(raw), "known_restaurants": int(known.sum()), "added_rows": 0, "updated_restaurants": 0,
+                   "dropped_by_cleaning": 0, "total_rows": len(df) }
+        with stage("clean_code"):
+            cleaned_base = apply_schema( clean_base(applied_raw) )
+            cleaned = convert_currency( cleaned_base, load_rates() )
+
+        report["dropped_by_cleaning"] = len(applied_raw) - len(cleaned)
+        if cleaned_base.empty:
+            return report
+
+        # A known restaurant's row sent again unchanged is a duplicate (a rebuild keeps the row already there):
+        # it is left out of the frames and of the CSV.
+        known_rows = cleaned_base.loc[ ids.contains( cleaned_base["restaurant_id"].to_numpy(dtype="int64") ) ]
+        old_rows = base.loc[ base["restaurant_id"].isin(known_rows["restaurant_id"]) ]
+        old_hashes = pd.Series( row_hashes(old_rows), index=old_rows["restaurant_id"].to_numpy() )
+        same = row_hashes(known_rows) == old_hashes.reindex( known_rows["restaurant_id"] ).to_numpy()
+        copies = known_rows.loc[ same, "restaurant_id" ]
+        cleaned_base = cleaned_base.loc[ ~cleaned_base["restaurant_id"].isin(copies) ]
+        cleaned = cleaned.loc[ ~cleaned["restaurant_id"].isin(copies) ]
+        if cleaned_base.empty:
+            return report
+
+        # The rows of updated restaurants are replaced in both frames: an update the currency conversion drops
+        # still takes the restaurant's old row out of the converted frame, as a rebuild would.
+        updated = known_rows.loc[ ~same, "restaurant_id" ]
+        replaced = df["restaurant_id"].isin(updated)
+        removed = df.loc[ replaced ]
+
+        base = concat_cleaned( [base.loc[ ~base["restaurant_id"].isin(updated) ], cleaned_base] )
+        df = concat_cleaned( [df.loc[ ~replaced ], cleaned] )
+
+        # The multi-cuisine cube is rebuilt from the frame (its cuisine tables come from the index of every row).
+        with stage("update_cube"):
+            cube = build_cube(df) if MULTI_CUISINE else update_cube(cube, cleaned, removed)
+        ids.add( cleaned_base["restaurant_id"].to_numpy(dtype="int64") )
+
+        new_key = append_rows( applied_raw.loc[ ~pd.Series( raw_ids(applied_raw), index=applied_raw.index ).isin(copies) ], path )
+        replace_cached( key, new_key, base, { "df": df, "cube": cube, "restaurant_ids": ids } )
+
+        if snapshot:
+            with stage("write_snapshot", "load"):
+                write_snapshot( base, snapshot_path(path), snapshot_metadata(new_key) )
+
+        report.update( added_rows=int( (~cleaned["restaurant_id"].isin(updated)).sum() ), updated_restaurants=int( updated.nunique() ),
+                       total_rows=len(df) )
+        return report
+
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Add the new and updated restaurants of a delta CSV to the dataset.",
+                                     epilog="Rows about restaurants already in the dataset replace their rows (votes, ratings, ...) "
+                                            "under ZOMATO_DEDUP=latest, the default; under the other policies they are skipped with a warning.")
+    parser.add_argument("delta", help="raw CSV with the columns of zomato.csv")
+    parser.add_argument("--csv", default=CSV_PATH, help="dataset to refresh")
+    parser.add_argument("--no-snapshot", action="store_true", help="don't rewrite the parquet snapshot")
+    args = parser.parse_args(argv)
+
+    print( json.dumps( refresh(args.delta, args.csv, snapshot=not args.no_snapshot) ) )
+    return 0
+
+
+
+if __name__ == "__main__":
+    sys.exit( main() )
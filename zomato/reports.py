@@ -0,0 +1,227 @@
+# Drilldown report of every country: the city and cuisine tables and charts of the Geographic and the
+# Restaurants and Cuisines pages, computed from that country's restaurants only.
+#
+#   python -m zomato.reports                        # reports/<version>/<country>.html, one worker per CPU
+#   python -m zomato.reports --workers 4
+#   python -m zomato.reports --workers 0            # in this process, one country after the other
+#
+# The cleaned frame is sorted by country and written once as an uncompressed Arrow IPC file. Each worker
+# process memory-maps it and reads only its country's rows (a contiguous slice), so no frame is pickled to
+# or from the workers: a task is (country, first row, rows) and its result a few counts. The version
+# directory is named like the artifacts' (see zomato.artifacts), and is written to a temporary directory first.
+
+# IMPORTS
+import argparse
+import concurrent.futures
+import html
+import json
+import logging
+import multiprocessing
+import os
+import shutil
+import sys
+import time
+
+import numpy as np
+
+from zomato import geographic, rest_cuisines
+from zomato.artifacts import KEEP_VERSIONS, dataset_version, prune, set_latest
+from zomato.cube import build_cube
+from zomato.data import COUNTRIES, CSV_PATH, load_data
+from zomato.lazy import LazyModule
+
+try:
+    import pyarrow as pa
+except ImportError:  # Without pyarrow there is no shared file to read from: reports are built in this process.
+    pa = None
+
+
+logger = logging.getLogger(__name__)
+
+go = LazyModule("plotly.graph_objects")
+
+DEFAULT_DIR = "reports"
+
+# Sections of a report: (heading, [(title or None, function(cube))]), in the pages' order. Country-level
+# results are left out, a report being about a single country.
+SECTIONS = [ ( "Cities", [ (None, geographic.cities_most_excellent_restaurants_chart),
+                           (None, geographic.cities_restaurant_pop_chart),
+                           (None, geographic.cities_delicery_chart),
+                           ("Most Expensive Cities", geographic.cities_cost_df),
+                           (None, geographic.cities_diversity_cuisine_chart) ] ),
+
+             ( "Restaurants and Cuisines", [ (None, rest_cuisines.votes_restaurants_voting_chart),
+                                             ("Restaurant Ratings by Reservation", rest_cuisines.restaurants_booking_ratings_df),
+                                             (None, rest_cuisines.cuisines_deliver_chart),
+                                             (None, rest_cuisines.cuisines_cost_chart),
+                                             (None, rest_cuisines.cuisines_favorites_chart) ] ) ]
+
+PAGE = """<!DOCTYPE html>
+<html>
+<head><meta charset="utf-8"><title>Zomato - {title}</title></head>
+<body>
+{body}
+</body>
+</html>
+"""
+
+# Name of the shared file, inside the version's temporary directory.
+PARTITIONS_FILE = ".partitions.arrow"
+
+
+
+# REPORTS
+# ==============================================================================================================================================
+
+def report_file(country):
+    # "United States of America" -> united_states_of_america.html
+    return country.lower().replace(" ", "_") + ".html"
+
+
+
+def render_report(country, df):
+    # HTML report of one country's cleaned rows.
+    cube = build_cube(df)
+    parts = [ f"<h1>{html.escape(country)}</h1>",
+              f"<p>{cube['totals']['restaurants']} restaurants in {cube['totals']['cities']} cities</p>" ]
+    plotlyjs = "cdn"
+
+    for heading, results in SECTIONS:
+        parts.append( f"<h2>{html.escape(heading)}</h2>" )
+
+        for title, function in results:
+            if title:
+                parts.append( f"<h3>{html.escape(title)}</h3>" )
+
+            value = function(cube)
+            if isinstance(value, go.Figure):
+                # plotly.js is loaded once, by the first chart.
+                parts.append( value.to_html(full_html=False, include_plotlyjs=plotlyjs) )
+                plotlyjs = False
+            else:
+                parts.append( value.to_html() )
+
+    return PAGE.format( title=html.escape(country), body="\n".join(parts) )
+
+
+
+def write_report(country, df, directory):
+    # Write the report of one country's rows to directory; returns its manifest entry.
+    start = time.perf_counter()
+    file = report_file(country)
+
+    with open(os.path.join(directory, file), "w", encoding="utf-8") as f:
+        f.write( render_report(country, df) )
+
+    return { "country": country, "file": file, "restaurants": len(df), "seconds": round(time.perf_counter() - start, 3),
+             "pid": os.getpid() }
+
+
+
+# WORKERS
+# ==============================================================================================================================================
+
+# The shared file, memory-mapped once per worker process.
+_table = None
+
+
+def _open_partitions(path):
+    # Worker initializer: map the file (nothing is read until a slice of it is converted).
+    global _table
+    with pa.ipc.open_file( pa.memory_map(path, "r") ) as reader:
+        _table = reader.read_all()
+
+
+
+def _country_task(country, first, rows, directory):
+    # Report of the rows first : first + rows of the shared file, the restaurants of country.
+    return write_report( country, _table.slice(first, rows).to_pandas(), directory )
+
+
+
+def write_partitions(df, path):
+    # Write the rows of df sorted by country to an Arrow IPC file at path; returns {country: (first row, rows)}.
+    codes = df["country"].cat.codes.to_numpy()
+    order = np.argsort(codes, kind="stable")
+
+    counts = np.bincount( codes[ codes >= 0 ], minlength=len(df["country"].cat.categories) )
+    firsts = np.cumsum(counts) - counts + np.count_nonzero(codes < 0)
+
+    table = pa.Table.from_pandas( df.take(order), preserve_index=False )
+    with pa.OSFile(path, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+
+    return { country: (int(first), int(rows)) for country, first, rows in zip(df["country"].cat.categories, firsts, counts) if rows }
+
+
+
+def generate_reports(path=CSV_PATH, out=DEFAULT_DIR, workers=None, keep=KEEP_VERSIONS):
+    # Write the report of every country of the COUNTRIES map (those with restaurants) as a new version of out;
+    # returns its directory. workers is the number of processes (one per CPU by default); 0 builds them here.
+    version = dataset_version(path)
+    directory = os.path.join(out, version)
+    workers = os.cpu_count() if workers is None else workers
+
+    df = load_data(path)
+    present = set( df["country"].unique() )
+    countries = [ country for country in COUNTRIES.values() if country in present ]
+
+    for country in COUNTRIES.values():
+        if country not in present:
+            logger.warning("No restaurants in %s; its report is skipped", country)
+
+    tmp = directory + ".tmp"
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+    start = time.perf_counter()
+
+    if not countries:
+        entries = []
+
+    elif workers and pa is not None:
+        partitions = write_partitions( df, os.path.join(tmp, PARTITIONS_FILE) )
+
+        # Workers are spawned, not forked: they start without the parent's threads and locks (DuckDB's,
+        # Streamlit's), and only ever see the shared file.
+        context = multiprocessing.get_context("spawn")
+        with concurrent.futures.ProcessPoolExecutor( min(workers, len(countries)), mp_context=context, initializer=_open_partitions,
+                                                     initargs=( os.path.join(tmp, PARTITIONS_FILE), ) ) as pool:
+            futures = [ pool.submit( _country_task, country, *partitions[country], tmp ) for country in countries ]
+            entries = [ future.result() for future in futures ]
+
+        os.remove( os.path.join(tmp, PARTITIONS_FILE) )
+
+    else:
+        grouped = dict( tuple(df.groupby("country", observed=True)) )
+        entries = [ write_report( country, grouped[country].reset_index(drop=True), tmp ) for country in countries ]
+
+    manifest = { "version": version, "source": os.path.abspath(path), "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                 "workers": workers if pa is not None else 0, "seconds": round(time.perf_counter() - start, 3), "reports": entries }
+
+    with open(os.path.join(tmp, "manifest.json"), "w") as f:
+        json.dump(manifest, f, indent=1)
+
+    shutil.rmtree(directory, ignore_errors=True)
+    os.replace(tmp, directory)
+    set_latest(out, version)
+    prune(out, keep)
+
+    return directory
+
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write the drilldown report of every country.")
+    parser.add_argument("--csv", default=CSV_PATH, help="dataset to report on")
+    parser.add_argument("--out", default=DEFAULT_DIR, help="reports directory")
+    parser.add_argument("--workers", type=int, help="worker processes (default: one per CPU, 0: none)")
+    parser.add_argument("--keep", type=int, default=KEEP_VERSIONS, help="versions to keep")
+    args = parser.parse_args(argv)
+
+    print( generate_reports(args.csv, args.out, args.workers, args.keep) )
+    return 0
+
+
+
+if __name__ == "__main__":
+    sys.exit( main() )
@@ -0,0 +1,115 @@
+# IMPORTS
+from zomato.helpers import adjust_df
+from zomato.lazy import LazyModule
+from zomato.profiling import timed
+
+
+# Imported when the first chart is drawn (tables don't need plotly).
+px = LazyModule("plotly.express")
+go = LazyModule("plotly.graph_objects")
+
+# Slice label and color of each has_online_delivery value.
+DELIVERY_LABELS = { 0: 'Restaurants Offline', 1: 'Restaurants Online' }
+DELIVERY_COLORS = { 0: 'dodgerblue', 1: 'indianred' }
+
+
+# Tables and charts of the Restaurants and Cuisines Overview page, computed from the aggregate cube (zomato.cube).
+# ==============================================================================================================================================
+
+@timed
+def votes_restaurants_voting_chart(cube):
+    # Pie chart votes for online and offline restaurants
+    votes_count_online_or_not = cube["online_delivery"].loc[:, ["votes_mean"]].rename(columns={"votes_mean": "votes"}).reset_index()
+
+    
+    # Pie chart (with a filter on online delivery, only one of the slices is there)
+    delivery = votes_count_online_or_not['has_online_delivery'].astype(int)
+    fig = go.Figure(data=[go.Pie( labels=delivery.map(DELIVERY_LABELS).tolist(), 
+                                  values=votes_count_online_or_not['votes'], 
+                                  marker=dict(colors=delivery.map(DELIVERY_COLORS).tolist()) )])
+
+    fig.update_layout( title_text='Votes amount', title_x=0.25, title_font=dict(size=24) )
+    
+    return fig
+
+
+
+@timed
+def restaurants_booking_ratings_df(cube):
+    # Ratings with and without reservation.
+    ratings_table_booking_df = cube["table_booking"].loc[:, ["rating_mean"]].rename(columns={"rating_mean": "aggregate_rating"}).reset_index().round(2)
+    ratings_table_booking_df['aggregate_rating'] = ratings_table_booking_df['aggregate_rating'].astype(str)
+    
+    return adjust_df(ratings_table_booking_df)
+
+
+
+@timed
+def cuisines_deliver_chart(cube):
+    #SA Barplot of cuisines delivering online
+    cuisines = cube["cuisines"]
+
+    cuisines_restaurants_online = ( cuisines.loc[ cuisines["online_restaurants"] > 0, ["online_restaurants"] ].sort_values("online_restaurants", ascending=False)
+                                                                                                              .reset_index() )
+
+    cuisines_restaurants_online.columns = ["cuisines", "restaurants_with_delivery_option"]
+    cuisines_restaurants_online = cuisines_restaurants_online.loc[ 0:4 , : ]
+
+
+    # Bar chart
+    fig = go.Figure(data=[go.Bar( x=cuisines_restaurants_online['cuisines'],
+                                  y=cuisines_restaurants_online['restaurants_with_delivery_option'],
+                                  marker_color='skyblue' )])
+
+    fig.update_layout(title_text='Cuisines x Amount of Restaurants delivering online',
+                      xaxis_title='Cuisine', yaxis_title='Restaurants')
+
+
+    return fig
+
+
+
+@timed
+def cuisines_cost_chart(cube):
+    #SA Barplot Cuisines cost.
+    cuisines_cost = ( cube["cuisines"].loc[ : , ["cost_mean"] ].rename(columns={"cost_mean": "dollar_average_cost_for_two"})
+                                                               .sort_values("dollar_average_cost_for_two", ascending=False)
+                                                               .reset_index() )
+
+    cuisines_cost['dollar_average_cost_for_two'] = cuisines_cost['dollar_average_cost_for_two'].astype(int)
+    cuisines_cost = cuisines_cost.loc[ 0:4 , : ]
+
+
+    fig = go.Figure(data=[go.Bar( x=cuisines_cost['cuisines'],
+                                  y=cuisines_cost['dollar_average_cost_for_two'],
+                                  marker_color='indianred' )])
+
+    fig.update_layout(title_text='Most expensive Cuisines for two people (dollars)',
+                      xaxis_title='Cuisine', yaxis_title='Cost for two')
+
+
+    return fig
+
+
+
+@timed
+def cuisines_favorites_chart(cube):
+    # Sunburst of countries' favorite dishes
+    df_cuisines_by_country = ( cube["country_cuisines"].loc[ : , ["rating_mean"] ].rename(columns={"rating_mean": "aggregate_rating"})
+                                                                                  .reset_index() ).round(2) 
+
+    cuisines_countries_favorites_df = ( df_cuisines_by_country.loc[ : , ["cuisines", "aggregate_rating", "country"] ].groupby( ["country"], observed=True ).max()
+                                                                                                                  .reset_index() )
+
+    cuisines_countries_favorites_df.sort_values('cuisines')
+
+    # Plotly Express would add a node for every category, so pass plain labels.
+    cuisines_countries_favorites_df = cuisines_countries_favorites_df.astype( {'cuisines': str, 'country': str} )
+
+
+    # Sunburst chart
+    fig = px.sunburst(cuisines_countries_favorites_df, path=['cuisines', 'country'], color='country', color_discrete_sequence=px.colors.qualitative.Set3)
+
+    fig.update_layout(title_text="Countries' favorite Cuisines", title_x=0.4)
+
+    return fig
@@ -0,0 +1,40 @@
+# IMPORTS
+import concurrent.futures
+import contextvars
+import os
+
+from zomato.artifacts import result
+from zomato.profiling import stage
+
+
+# Threads evaluating the pages' results, shared by every session of the process (default: as many as
+# ThreadPoolExecutor picks for this machine). 1 evaluates them one after the other.
+PAGE_WORKERS = int( os.environ.get("ZOMATO_PAGE_WORKERS", "0") ) or None
+
+_pool = concurrent.futures.ThreadPoolExecutor( PAGE_WORKERS, thread_name_prefix="zomato-page" )
+
+
+
+# PAGE SCHEDULER
+# ==============================================================================================================================================
+
+class PageResults:
+    # Results of a page section, all submitted at once to the thread pool: the functions only read the cube,
+    # and pandas releases the GIL in much of their work, so the section takes about as long as its slowest
+    # function rather than the sum of them. The page asks for them in layout order (get), waiting only for
+    # those not done yet; each runs in a copy of the page's context, so its profiling stages join the run.
+    def __init__(self, functions, cube, filters=None, layouts=None):
+        layouts = layouts or {}
+        self.futures = { function: _pool.submit( contextvars.copy_context().run, result, function, cube, filters, layouts.get(function) )
+                         for function in functions }
+
+
+    def get(self, function):
+        # function's result (see zomato.artifacts.result), once it is computed.
+        future = self.futures[function]
+
+        if not future.done():
+            with stage(f"wait({function.__name__})", "schedule"):
+                return future.result()
+
+        return future.result()
@@ -0,0 +1,79 @@
+# IMPORTS
+import pandas as pd
+
+
+# DTYPES OF THE CLEANED DATASET
+# ==============================================================================================================================================
+
+# Low-cardinality text columns, stored once per distinct value.
+# Ordered alphabetically, so sorting, min and max behave as they did on plain strings.
+CATEGORICAL_COLUMNS = [ "country", "city", "locality", "cuisines", "cuisine_list", "currency", "price_type", "rating_color", "rating_text" ]
+
+# 0/1 flags and small codes.
+INT8_COLUMNS = [ "has_table_booking", "has_online_delivery", "is_delivering_now", "switch_to_order_menu", "price_range" ]
+
+# Remaining integer columns, narrowed to the smallest type that holds their values.
+INTEGER_COLUMNS = [ "restaurant_id", "country_code", "average_cost_for_two", "votes" ]
+
+# Float columns, narrowed to float32 only when that loses no precision.
+# (dollar_average_cost_for_two is added after the schema, as float64: see data.convert_currency.)
+FLOAT_COLUMNS = [ "longitude", "latitude", "aggregate_rating" ]
+
+
+
+def apply_schema(df):
+    # Return a copy of the cleaned frame cast to compact dtypes.
+    dtypes = {}
+
+    for col in CATEGORICAL_COLUMNS:
+        dtypes[col] = pd.CategoricalDtype(ordered=True)
+
+    for col in INT8_COLUMNS:
+        dtypes[col] = "int8"
+
+    for col in INTEGER_COLUMNS:
+        dtypes[col] = pd.to_numeric(df[col], downcast="integer").dtype
+
+    for col in FLOAT_COLUMNS:
+        if df[col].astype("float32").astype(df[col].dtype).equals(df[col]):
+            dtypes[col] = "float32"
+
+    return df.astype(dtypes)
+
+
+
+def union_categories(frames):
+    # The frames with their categorical columns cast to one shared dtype holding every frame's categories
+    # (still sorted), so they can be concatenated without falling back to plain strings.
+    shared = [ col for col in CATEGORICAL_COLUMNS if all( col in frame and frame[col].dtype == "category" for frame in frames ) ]
+    dtypes = { col: pd.CategoricalDtype( sorted( set().union( *(frame[col].cat.categories for frame in frames) ) ), ordered=True )
+               for col in shared }
+
+    return [ frame.astype(dtypes) for frame in frames ]
+
+
+
+def concat_cleaned(frames):
+    # Rows of cleaned frames (with apply_schema dtypes) one after the other, as if cleaned and cast together.
+    return pd.concat( union_categories(frames), ignore_index=True )
+
+
+
+def row_hashes(df):
+    # One hash per row of a cleaned frame, equal for rows of separately cleaned frames holding the same values:
+    # categories are hashed by value and numbers as float64 (apply_schema only narrows when that is lossless).
+    dtypes = { col: "float64" for col in df.columns if pd.api.types.is_numeric_dtype(df[col]) }
+    return pd.util.hash_pandas_object( df.astype(dtypes), index=False ).to_numpy()
+
+
+
+def memory_report(before, after):
+    # Deep memory usage per column (bytes) of a frame before and after apply_schema.
+    report = pd.DataFrame( { "dtype_before": before.dtypes.astype(str),
+                             "dtype_after": after.dtypes.astype(str),
+                             "bytes_before": before.memory_usage(index=False, deep=True),
+                             "bytes_after": after.memory_usage(index=False, deep=True) } )
+
+    report.loc["total"] = [ "", "", report["bytes_before"].sum(), report["bytes_after"].sum() ]
+
+    return report
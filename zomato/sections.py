@@ -0,0 +1,13 @@
+# IMPORTS
+import streamlit as st
+
+
+
+# LAZY SECTIONS
+# ==============================================================================================================================================
+
+def lazy_tabs(labels, key):
+    # Tab bar that only runs the selected section: returns its label, for the page to branch on.
+    # st.tabs runs (and sends) the content of every tab on each run; here the other sections aren't
+    # computed until they are selected, and their results stay cached once they are.
+    return st.radio( "Section", labels, horizontal=True, key=key, label_visibility="collapsed" )
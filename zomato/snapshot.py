@@ -0,0 +1,69 @@
+# IMPORTS
+import json
+import os
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Snapshots are an optimization; without pyarrow we just parse the CSV.
+    pa = None
+    pq = None
+
+
+# Key of the parquet schema metadata that records what the snapshot was built from.
+METADATA_KEY = b'zomato_snapshot'
+
+
+
+# COLUMNAR SNAPSHOTS
+# ==============================================================================================================================================
+
+def snapshot_path(csv_path):
+    # zomato.csv -> zomato.clean.parquet, in the same folder.
+    root, _ = os.path.splitext(csv_path)
+    return root + '.clean.parquet'
+
+
+
+def read_snapshot(path, metadata):
+    # Return the cleaned frame stored at path, or None if it is missing, unreadable or built from other inputs.
+    if pq is None or not os.path.exists(path):
+        return None
+
+    try:
+        schema = pq.read_schema(path, memory_map=True)
+        stored = json.loads( (schema.metadata or {}).get(METADATA_KEY, b'null') )
+
+        if stored != metadata:
+            return None
+
+        table = pq.read_table(path, memory_map=True)
+
+    except (OSError, ValueError, pa.ArrowException):
+        return None
+
+    return table.to_pandas()
+
+
+
+def write_snapshot(df, path, metadata):
+    # Persist the cleaned frame as compressed parquet, tagged with its metadata.
+    # Written to a temporary file first so readers never see a half-written snapshot.
+    if pq is None:
+        return False
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    table = table.replace_schema_metadata( {**(table.schema.metadata or {}), METADATA_KEY: json.dumps(metadata).encode()} )
+
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    try:
+        pq.write_table(table, tmp_path, compression='zstd')
+        os.replace(tmp_path, path)
+
+    except OSError:
+        # Read-only deploys still work, they just parse the CSV on every cold start.
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return False
+
+    return True
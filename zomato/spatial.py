@@ -0,0 +1,114 @@
+# IMPORTS
+import numpy as np
+from haversine import Unit, haversine
+
+
+# Mean Earth radius used by the haversine package (half the equator is pi radii away).
+EARTH_RADIUS_KM = haversine( (0, 0), (0, 180), unit=Unit.KILOMETERS ) / np.pi
+
+# Side of the grid cells restaurants are bucketed in, in degrees (about 28 km at the equator).
+CELL_DEGREES = 0.25
+
+
+
+# DISTANCES
+# ==============================================================================================================================================
+
+def great_circle_km(lat, lon, latitudes, longitudes):
+    # Haversine distance in km from the point (lat, lon) to every point of the arrays, in one vectorized pass
+    # (haversine_vector checks its input point by point in Python, which would cost more than the query itself).
+    lat, lon = np.radians(lat), np.radians(lon)
+    latitudes, longitudes = np.radians(latitudes), np.radians(longitudes)
+
+    a = np.sin( (latitudes - lat) / 2 ) ** 2 + np.cos(lat) * np.cos(latitudes) * np.sin( (longitudes - lon) / 2 ) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin( np.sqrt( np.clip(a, 0.0, 1.0) ) )
+
+
+
+# SPATIAL INDEX
+# ==============================================================================================================================================
+
+class SpatialIndex:
+    # Restaurants of a frame bucketed in a latitude / longitude grid and sorted by cell, like geohash prefixes.
+    # A query measures the distance only to the restaurants of the cells its circle can reach, found with a
+    # binary search per cell, so its cost grows with the restaurants around the point, not with the dataset.
+    def __init__(self, df, cell_degrees=CELL_DEGREES):
+        self.cell_degrees = cell_degrees
+        self.n_rows = int( np.ceil(180 / cell_degrees) )
+        self.n_cols = int( np.ceil(360 / cell_degrees) )
+
+        self.latitudes = df["latitude"].to_numpy(dtype=np.float64)
+        self.longitudes = df["longitude"].to_numpy(dtype=np.float64)
+
+        cells = self._row(self.latitudes) * self.n_cols + self._col(self.longitudes)
+        self.order = np.argsort(cells, kind="stable")
+        self.cells = cells[ self.order ]
+
+
+    def __len__(self):
+        return len(self.order)
+
+
+    def _row(self, latitudes):
+        return np.clip( np.floor( (np.asarray(latitudes) + 90) / self.cell_degrees ), 0, self.n_rows - 1 ).astype(np.int64)
+
+
+    def _col(self, longitudes):
+        return ( np.floor( (np.asarray(longitudes) + 180) / self.cell_degrees ).astype(np.int64) ) % self.n_cols
+
+
+    def candidates(self, lat, lon, radius_km):
+        # Positions (in the frame) of the restaurants in every cell the circle of radius_km around the point reaches.
+        angle = radius_km / EARTH_RADIUS_KM
+        lat_span = np.degrees(angle)
+
+        rows = np.arange( self._row(lat - lat_span), self._row(lat + lat_span) + 1 )
+
+        if lat + lat_span >= 90 or lat - lat_span <= -90 or angle >= np.pi / 2:
+            # The circle holds a pole: every longitude.
+            cols = np.arange(self.n_cols)
+        else:
+            # Widest longitude offset of the circle, reached where its edge is tangent to a meridian.
+            lon_span = np.degrees( np.arcsin( min( np.sin(angle) / np.cos( np.radians(lat) ), 1.0 ) ) )
+            first, last = self._col(lon - lon_span), self._col(lon + lon_span)
+            cols = np.arange(first, last + 1) if first <= last else np.r_[ first:self.n_cols, 0:last + 1 ]
+
+        cells = ( rows[ :, None ] * self.n_cols + cols[ None, : ] ).ravel()
+        if len(cells) >= len(self.cells):
+            # More cells to look up than restaurants: measuring them all is cheaper.
+            return np.arange( len(self.order) )
+
+        starts = np.searchsorted(self.cells, cells, side="left")
+        lengths = np.searchsorted(self.cells, cells, side="right") - starts
+        starts, lengths = starts[ lengths > 0 ], lengths[ lengths > 0 ]
+
+        # Concatenation of the ranges starts[i] : starts[i] + lengths[i], without a Python loop.
+        offsets = np.arange( lengths.sum() ) - np.repeat( np.cumsum(lengths) - lengths, lengths )
+        return self.order[ np.repeat(starts, lengths) + offsets ]
+
+
+    def within(self, lat, lon, radius_km):
+        # Positions of the restaurants at most radius_km from the point, and their distances, nearest first.
+        positions = self.candidates(lat, lon, radius_km)
+        distances = great_circle_km( lat, lon, self.latitudes[positions], self.longitudes[positions] )
+
+        inside = distances <= radius_km
+        positions, distances = positions[inside], distances[inside]
+
+        order = np.argsort(distances, kind="stable")
+        return positions[order], distances[order]
+
+
+    def nearest(self, lat, lon, k):
+        # Positions of the k restaurants nearest the point, and their distances, nearest first. The search radius
+        # starts at one cell and doubles until it holds k restaurants: all of them are measured, so the k nearest
+        # are among them.
+        k = min( k, len(self) )
+        radius_km = np.radians(self.cell_degrees) * EARTH_RADIUS_KM
+
+        while True:
+            positions, distances = self.within(lat, lon, radius_km)
+            if len(positions) >= k or radius_km >= np.pi * EARTH_RADIUS_KM:
+                return positions[:k], distances[:k]
+
+            radius_km *= 2
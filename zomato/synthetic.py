@@ -0,0 +1,241 @@
+# Synthetic zomato.csv files of any size, for load and scale testing without the real data.
+#
+#   python -m zomato.synthetic --rows 1000000 --output synthetic.csv                     # learned from zomato.csv
+#   python -m zomato.synthetic --source export.csv --save-profile profile.json --rows 0  # only learn the profile
+#   python -m zomato.synthetic --profile profile.json --rows 50000000 --output big.csv
+#
+# A profile holds distributions only (country, city and locality weights, per-city coordinate spread, cuisine
+# strings, cost / rating / flag combinations, vote quantiles, duplicate and NaN rates). Restaurant names and
+# addresses are never copied into it, so a profile learned from a private export can be shared.
+
+# IMPORTS
+import argparse
+import json
+import sys
+
+import numpy as np
+import pandas as pd
+
+from zomato.data import CSV_PATH
+
+
+# The raw columns of zomato.csv, in file order.
+COLUMNS = [ "Restaurant ID", "Restaurant Name", "Country Code", "City", "Address", "Locality", "Locality Verbose",
+            "Longitude", "Latitude", "Cuisines", "Average Cost for two", "Currency", "Has Table booking",
+            "Has Online delivery", "Is delivering now", "Switch to order menu", "Price range", "Aggregate rating",
+            "Rating color", "Rating text", "Votes" ]
+
+# Columns sampled together, because their values depend on each other.
+COST_COLUMNS = [ "Average Cost for two", "Price range" ]
+RATING_COLUMNS = [ "Aggregate rating", "Rating color", "Rating text" ]
+FLAG_COLUMNS = [ "Has Table booking", "Has Online delivery", "Is delivering now", "Switch to order menu" ]
+
+# Points the vote distribution of each (country, rating color) is kept at.
+VOTE_QUANTILES = np.linspace(0, 1, 21)
+
+# Spread (degrees) of restaurants around their city centre: robust estimate, kept within these bounds.
+MIN_SPREAD = 0.005
+MAX_SPREAD = 0.5
+
+# Words the made-up restaurant names and streets are built from.
+NAME_KINDS = [ "Kitchen", "Cafe", "Bistro", "Grill", "House", "Diner", "Eatery", "Bar", "Corner", "Express" ]
+STREETS = [ "Main", "Park", "Market", "Station", "Church", "Lake", "Hill", "Mill", "Bridge", "Garden" ]
+
+DEFAULT_CHUNKSIZE = 500_000
+
+
+
+# PROFILE
+# ==============================================================================================================================================
+
+def _weights(frame, columns):
+    # [[value, ..., count], ...] of every combination of columns in frame.
+    counts = frame.groupby( columns, dropna=False ).size().reset_index(name="count")
+    return [ [ None if pd.isna(v) else (v.item() if hasattr(v, "item") else v) for v in row ]
+             for row in counts.itertuples(index=False) ]
+
+
+
+def _spread(values):
+    # Robust standard deviation (scaled median absolute deviation), so a few misplaced pins don't blow up a city.
+    spread = 1.4826 * np.median( np.abs(values - np.median(values)) )
+    return float( np.clip(spread, MIN_SPREAD, MAX_SPREAD) )
+
+
+
+def learn_profile(raw):
+    # JSON-serializable distributions of a raw zomato.csv frame.
+    unique = raw.drop_duplicates()
+    countries = {}
+
+    for code, rows in unique.groupby("Country Code"):
+        cities = {}
+        for city, city_rows in rows.groupby("City"):
+            cities[city] = { "count": len(city_rows),
+                             "latitude": [ float(city_rows["Latitude"].median()), _spread(city_rows["Latitude"]) ],
+                             "longitude": [ float(city_rows["Longitude"].median()), _spread(city_rows["Longitude"]) ],
+                             "localities": _weights(city_rows, ["Locality"]) }
+
+        votes = { color: np.quantile(color_rows["Votes"], VOTE_QUANTILES).round(1).tolist()
+                  for color, color_rows in rows.groupby("Rating color") }
+
+        countries[str(code)] = { "count": len(rows),
+                                 "currencies": _weights(rows, ["Currency"]),
+                                 "cities": cities,
+                                 "cuisines": _weights(rows.dropna(subset=["Cuisines"]), ["Cuisines"]),
+                                 "costs": _weights(rows, COST_COLUMNS),
+                                 "ratings": _weights(rows, RATING_COLUMNS),
+                                 "flags": _weights(rows, FLAG_COLUMNS),
+                                 "votes": votes }
+
+    return { "rows": len(raw),
+             "duplicate_rate": 1 - len(unique) / len(raw),
+             "nan_rates": { col: float(rate) for col, rate in unique.isna().mean().items() if rate > 0 },
+             "countries": countries }
+
+
+
+def save_profile(profile, path):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(profile, f, ensure_ascii=False, indent=1)
+
+
+
+def load_profile(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+
+# GENERATOR
+# ==============================================================================================================================================
+
+def _choice(rng, weighted, n):
+    # Indices of n draws from [[value, ..., count], ...] rows, in proportion to their counts.
+    counts = np.array( [ row[-1] for row in weighted ], dtype="float64" )
+    return rng.choice( len(weighted), size=n, p=counts / counts.sum() )
+
+
+
+def _columns(weighted, idx, names):
+    # Columns of the drawn rows of [[value, ..., count], ...], as {name: array}.
+    values = np.array( [ row[:-1] for row in weighted ], dtype=object )[idx]
+    return { name: values[ : , i ] for i, name in enumerate(names) }
+
+
+
+def _country_rows(rng, code, country, n):
+    # n rows of a single country, every column but the IDs and names.
+    rows = { "Country Code": np.full(n, int(code)) }
+    rows.update( _columns( country["currencies"], _choice(rng, country["currencies"], n), ["Currency"] ) )
+    rows.update( _columns( country["cuisines"], _choice(rng, country["cuisines"], n), ["Cuisines"] ) )
+    rows.update( _columns( country["costs"], _choice(rng, country["costs"], n), COST_COLUMNS ) )
+    rows.update( _columns( country["ratings"], _choice(rng, country["ratings"], n), RATING_COLUMNS ) )
+    rows.update( _columns( country["flags"], _choice(rng, country["flags"], n), FLAG_COLUMNS ) )
+
+    # Votes are drawn from the quantiles of the restaurants with the same rating color (unrated ones get none).
+    votes = np.zeros(n)
+    for color, quantiles in country["votes"].items():
+        same = rows["Rating color"] == color
+        votes[same] = np.interp( rng.random( same.sum() ), VOTE_QUANTILES, quantiles )
+    rows["Votes"] = votes.round().astype(np.int64)
+
+    # Cities, then a locality and a point around the centre of each one.
+    cities = list( country["cities"] )
+    city_idx = _choice( rng, [ [ c, country["cities"][c]["count"] ] for c in cities ], n )
+    rows["City"] = np.array(cities, dtype=object)[city_idx]
+    rows["Locality"] = np.empty(n, dtype=object)
+    rows["Latitude"], rows["Longitude"] = np.empty(n), np.empty(n)
+
+    for i, city in enumerate(cities):
+        here = np.flatnonzero(city_idx == i)
+        if len(here) == 0:
+            continue
+
+        profile = country["cities"][city]
+        rows["Locality"][here] = _columns( profile["localities"], _choice(rng, profile["localities"], len(here)), ["Locality"] )["Locality"]
+        rows["Latitude"][here] = np.clip( rng.normal( *profile["latitude"], len(here) ), -85, 85 )
+        rows["Longitude"][here] = ( rng.normal( *profile["longitude"], len(here) ) + 180 ) % 360 - 180
+
+    return rows
+
+
+
+def generate(profile, n, rng, first_id=1):
+    # A frame of n synthetic raw rows with the COLUMNS of zomato.csv; restaurant IDs start at first_id.
+    countries = list( profile["countries"] )
+    country_idx = _choice( rng, [ [ c, profile["countries"][c]["count"] ] for c in countries ], n )
+    columns = {}
+
+    for i, code in enumerate(countries):
+        here = np.flatnonzero(country_idx == i)
+        if len(here) == 0:
+            continue
+
+        for name, values in _country_rows( rng, code, profile["countries"][code], len(here) ).items():
+            columns.setdefault( name, np.empty(n, dtype=values.dtype) )[here] = values
+
+    df = pd.DataFrame(columns)
+    df["Restaurant ID"] = np.arange(first_id, first_id + n)
+    df["Latitude"] = df["Latitude"].round(6)
+    df["Longitude"] = df["Longitude"].round(6)
+
+    first_cuisine = df["Cuisines"].str.split(",", n=1).str[0]
+    df["Restaurant Name"] = first_cuisine + " " + pd.Series( rng.choice(NAME_KINDS, n) ) + " " + df["Restaurant ID"].astype(str)
+    df["Address"] = ( pd.Series( rng.integers(1, 500, n) ).astype(str) + " " + pd.Series( rng.choice(STREETS, n) ) + " Road, "
+                      + df["Locality"] + ", " + df["City"] )
+    df["Locality Verbose"] = df["Locality"] + ", " + df["City"]
+
+    for col, rate in profile["nan_rates"].items():
+        df.loc[ rng.random(n) < rate, col ] = np.nan
+
+    # Exact copies of earlier rows, at the duplicate rate of the source.
+    duplicate = rng.random(n) < profile["duplicate_rate"]
+    originals = np.flatnonzero(~duplicate)
+    duplicate &= np.arange(n) > ( originals[0] if len(originals) else n )
+    positions = np.flatnonzero(duplicate)
+    order = np.arange(n)
+    order[positions] = originals[ ( rng.random(len(positions)) * np.searchsorted(originals, positions) ).astype(np.int64) ]
+
+    return df.iloc[ order ].reset_index(drop=True).loc[ : , COLUMNS ]
+
+
+
+def write_csv(profile, rows, path, seed=0, chunksize=DEFAULT_CHUNKSIZE):
+    # Write `rows` synthetic rows to path, generated and appended chunksize rows at a time.
+    rng = np.random.default_rng(seed)
+
+    for start in range(0, rows, chunksize):
+        chunk = generate( profile, min(chunksize, rows - start), rng, first_id=start + 1 )
+        chunk.to_csv(path, mode="w" if start == 0 else "a", header=(start == 0), index=False)
+
+    return path
+
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a synthetic zomato.csv of any size.")
+    parser.add_argument("--rows", type=int, default=100_000, help="rows to generate")
+    parser.add_argument("--output", default="synthetic.csv", help="CSV to write")
+    parser.add_argument("--source", default=CSV_PATH, help="raw CSV the profile is learned from")
+    parser.add_argument("--profile", help="use a saved profile instead of learning one from --source")
+    parser.add_argument("--save-profile", help="also write the profile to this JSON file")
+    parser.add_argument("--seed", type=int, default=0, help="random seed (the same seed and profile give the same file)")
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE, help="rows generated per batch")
+    args = parser.parse_args(argv)
+
+    profile = load_profile(args.profile) if args.profile else learn_profile( pd.read_csv(args.source) )
+
+    if args.save_profile:
+        save_profile(profile, args.save_profile)
+
+    if args.rows > 0:
+        write_csv(profile, args.rows, args.output, args.seed, args.chunksize)
+        print(f"Wrote {args.rows} rows to {args.output}", file=sys.stderr)
+
+    return 0
+
+
+
+if __name__ == "__main__":
+    sys.exit( main() )